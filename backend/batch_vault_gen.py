@@ -1,4 +1,3 @@
-import json
 import hashlib
 from pathlib import Path
 from models import PipelineResult, DirectorCritique
@@ -31,8 +30,7 @@ def batch_generate_vault_artifacts():
 
     for rf in result_files:
         try:
-            data = json.loads(rf.read_text(encoding='utf-8'))
-            result = PipelineResult.model_validate(data)
+            result = PipelineResult.model_validate_json(rf.read_bytes())
             
             if not result.success or not result.blueprint or not result.edl or not result.advisor:
                 continue
@@ -13,7 +13,7 @@ import time
 from pathlib import Path
 from typing import List
 import google.generativeai as genai
-from models import StyleBlueprint, ClipMetadata, ClipIndex, EnergyLevel, MotionType, Segment, BestMoment
+from models import StyleBlueprint, ClipMetadata, ClipIndex, EnergyLevel, MotionType, Segment, BestMoment, SEGMENTS_ADAPTER, CLIPS_ADAPTER
 from utils.api_key_manager import get_key_manager, get_api_key, rotate_api_key
 
 # ============================================================================
@@ -25,6 +25,23 @@ from utils.api_key_manager import get_key_manager, get_api_key, rotate_api_key
 REFERENCE_CACHE_VERSION = "12.1"  # v12.1: Director-Soul Intelligence: Sensory Contracts, Pacing Authority, Narrative Scale Role (Feb 4, 2026)
 CLIP_CACHE_VERSION = "7.0"        # v7.0: Enhanced analysis with intensity, motion granularity, semantic content, and moment roles (Jan 27, 2026)
 
+# Enum members by label, resolved once (skips EnumMeta.__call__ per clip).
+# New v7.0 motion types map onto the legacy Static/Dynamic enum.
+_ENERGY_BY_VALUE = {m.value: m for m in EnergyLevel}
+_MOTION_BY_LABEL = {
+    "STILL": MotionType.STATIC,
+    "GENTLE": MotionType.DYNAMIC,
+    "ACTIVE": MotionType.DYNAMIC,
+    "KINETIC": MotionType.DYNAMIC,
+    "Static": MotionType.STATIC,
+    "Dynamic": MotionType.DYNAMIC,
+}
+
+
+def _energy_level(value) -> EnergyLevel:
+    """EnergyLevel for a cached/API label; unknown labels still raise ValueError."""
+    return _ENERGY_BY_VALUE.get(value) or EnergyLevel(value)
+
 # ============================================================================
 # PROMPTS (These are CRITICAL—do not modify without testing)
 # ============================================================================
@@ -840,37 +857,49 @@ def _parse_json_response(response_text: str) -> dict:
     Parse Gemini's JSON response using brace balancing for robustness.
     """
     import re
+    from utils import loads_json
     text = response_text.strip()
 
     # First try the simple regex for well-formed responses
     match = re.search(r'\{.*\}', text, re.DOTALL)
+    data = None
     if match:
         text = match.group(0)
-
-    # Use brace balancing to extract the outermost JSON object
-    start_idx = text.find('{')
-    if start_idx == -1:
-        raise ValueError("No JSON object found in response")
-
-    brace_count = 0
-    end_idx = start_idx
-
-    for i in range(start_idx, len(text)):
-        if text[i] == '{':
-            brace_count += 1
-        elif text[i] == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                end_idx = i
-                break
-
-    if brace_count != 0:
-        raise ValueError(f"Unbalanced braces in JSON response. Final count: {brace_count}")
-
-    json_text = text[start_idx:end_idx + 1]
+        # Fast path: a single well-formed object parses as-is (orjson when
+        # available), skipping the character-by-character brace scan below.
+        # Anything orjson rejects (NaN, trailing prose...) takes the old path.
+        try:
+            data = loads_json(text)
+        except ValueError:
+            data = None
+
+    json_text = text
+    if not isinstance(data, dict):
+        # Use brace balancing to extract the outermost JSON object
+        start_idx = text.find('{')
+        if start_idx == -1:
+            raise ValueError("No JSON object found in response")
+
+        brace_count = 0
+        end_idx = start_idx
+
+        for i in range(start_idx, len(text)):
+            if text[i] == '{':
+                brace_count += 1
+            elif text[i] == '}':
+                brace_count -= 1
+                if brace_count == 0:
+                    end_idx = i
+                    break
+
+        if brace_count != 0:
+            raise ValueError(f"Unbalanced braces in JSON response. Final count: {brace_count}")
+
+        json_text = text[start_idx:end_idx + 1]
 
     try:
-        data = json.loads(json_text)
+        if data is None:
+            data = json.loads(json_text)
 
         # Only clean the specific enum fields, NOT all strings
         # This prevents corrupting "reason" fields that contain words like "high" or "dynamic"
@@ -1028,7 +1057,7 @@ def analyze_reference_video(
     muted_cache_dir.mkdir(parents=True, exist_ok=True)
     
     # Cache key includes file hash AND number of hints to ensure fresh analysis if hints change
-    from utils import get_file_hash, save_hash_registry
+    from utils import get_file_hash, save_hash_registry, load_json, write_json_atomic
     file_hash = get_file_hash(video_path)
     
     # v12.1 INVARIANT: Authoritative Cache Lookup
@@ -1046,15 +1075,14 @@ def analyze_reference_video(
     candidates = []
     for m in matches:
         try:
-            with open(m, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                ver = data.get("_cache_version", data.get("cache_version", "0.0"))
-                candidates.append({
-                    "path": m,
-                    "version": ver,
-                    "mtime": m.stat().st_mtime,
-                    "is_hint_match": hint_tag and hint_tag in m.name
-                })
+            data = load_json(m)
+            ver = data.get("_cache_version", data.get("cache_version", "0.0"))
+            candidates.append({
+                "path": m,
+                "version": ver,
+                "mtime": m.stat().st_mtime,
+                "is_hint_match": hint_tag and hint_tag in m.name
+            })
         except: continue
 
     if candidates:
@@ -1081,9 +1109,9 @@ def analyze_reference_video(
         cache_type = "Hybrid Rhythmic" if "h" in cache_file.name else "General"
         print(f"[CACHE] Loaded {cache_type} analysis: {cache_file.name}")
         try:
-            # Read cache with UTF-8 encoding to handle emojis/unicode from Gemini
-            with open(cache_file, encoding='utf-8') as f:
-                cache_data = json.load(f)
+            # Read cache (orjson parses the raw UTF-8 bytes when available;
+            # its key cache means repeated field names are not re-hashed)
+            cache_data = load_json(cache_file)
             
             # Check cache version (file is now closed, safe to delete if needed)
             cache_version = cache_data.get("_cache_version", "1.0")
@@ -1091,11 +1119,11 @@ def analyze_reference_video(
                 print(f"[CACHE] Reference version mismatch ({cache_version} vs {REFERENCE_CACHE_VERSION}). Re-analyzing...")
                 cache_file.unlink()  # Safe: file is closed
             else:
-                # Hydrate the blueprint, preserving the contract if it exists in the cache
-                blueprint_data = {k: v for k, v in cache_data.items() if not k.startswith("_")}
-                if "_contract" in cache_data:
-                    blueprint_data["contract"] = cache_data["_contract"]
-                blueprint = StyleBlueprint(**blueprint_data)
+                # Hydrate the blueprint straight from the cache dict: "_contract" is the
+                # contract field's alias and other "_" bookkeeping keys are ignored as
+                # extras. Still validated: the cache holds the raw Gemini JSON, so the
+                # segment checks (e.g. truncated-tail auto-extend) must run again.
+                blueprint = StyleBlueprint.model_validate(cache_data)
 
                 # Apply subdivision only if cache was not created with scene hints
                 # (preserve original rhythm when mimicking detected cuts)
@@ -1261,8 +1289,7 @@ Rules for hinted analysis:
                 "_cache_version": REFERENCE_CACHE_VERSION,
                 "_cached_at": time.strftime("%Y-%m-%d %H:%M:%S")
             }
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(cache_file, cache_data, indent=True)
             
             print(f"[OK] Analysis complete: {len(blueprint.segments)} segments (Auth: v{REFERENCE_CACHE_VERSION})")
             return blueprint
@@ -1456,16 +1483,15 @@ def _analyze_single_clip_comprehensive(
     clip_cache_dir = cache_dir / "clips"
     clip_cache_dir.mkdir(parents=True, exist_ok=True)
     
-    from utils import get_file_hash
+    from utils import get_file_hash, load_json, write_json_atomic
     file_hash = get_file_hash(clip_path)
     
     cache_file = clip_cache_dir / f"clip_comprehensive_{file_hash}.json"
 
     if cache_file.exists():
         try:
-            # Read cache with UTF-8 encoding
-            with open(cache_file, encoding='utf-8') as f:
-                cache_data = json.load(f)
+            # Read cache (orjson parses the raw bytes when available)
+            cache_data = load_json(cache_file)
             
             # Check cache version (file is now closed, safe to delete if needed)
             cache_version = cache_data.get("_cache_version", "1.0")
@@ -1474,19 +1500,11 @@ def _analyze_single_clip_comprehensive(
                 cache_file.unlink()  # Safe: file is closed
             else:
                     # Reconstruct ClipMetadata from cache
-                    energy = EnergyLevel(cache_data["energy"])
+                    energy = _energy_level(cache_data["energy"])
                     
                     # Map new motion types to legacy enum (for v7.0 cache compatibility)
                     motion_str = cache_data.get("motion", "Dynamic")
-                    motion_map = {
-                        "STILL": "Static",
-                        "GENTLE": "Dynamic",
-                        "ACTIVE": "Dynamic",
-                        "KINETIC": "Dynamic",
-                        "Static": "Static",
-                        "Dynamic": "Dynamic"
-                    }
-                    motion = MotionType(motion_map.get(motion_str, "Dynamic"))
+                    motion = _MOTION_BY_LABEL.get(motion_str, MotionType.DYNAMIC)
                     
                     best_moments = None
                     if "best_moments" in cache_data:
@@ -1562,19 +1580,11 @@ def _analyze_single_clip_comprehensive(
             json_data = _parse_json_response(response.text)
             
             # Parse overall classification
-            energy = EnergyLevel(json_data["energy"])
+            energy = _energy_level(json_data["energy"])
             motion_str = json_data.get("motion", "Dynamic")
             
             # Map new motion types to legacy enum for backward compatibility
-            motion_map = {
-                "STILL": "Static",
-                "GENTLE": "Dynamic",
-                "ACTIVE": "Dynamic", 
-                "KINETIC": "Dynamic",
-                "Static": "Static",
-                "Dynamic": "Dynamic"
-            }
-            motion = MotionType(motion_map.get(motion_str, "Dynamic"))
+            motion = _MOTION_BY_LABEL.get(motion_str, MotionType.DYNAMIC)
             
             # Parse v7.0+ enhanced fields
             intensity = json_data.get("intensity", 2)
@@ -1660,8 +1670,7 @@ def _analyze_single_clip_comprehensive(
                 "_cache_version": CLIP_CACHE_VERSION,
                 "_cached_at": time.strftime("%Y-%m-%d %H:%M:%S")
             }
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(cache_file, cache_data, indent=True)
             
             # VIBE DERIVATION: If vibes are empty, derive from primary_subject for matcher compatibility
             if not vibes and primary_subject:
@@ -1820,7 +1829,7 @@ def create_fallback_blueprint(video_path: str) -> StyleBlueprint:
         elif progress < 0.7: energy = EnergyLevel.MEDIUM
         else: energy = EnergyLevel.HIGH
 
-        segments.append(Segment(
+        segments.append(dict(
             id=segment_id,
             start=current_time,
             end=end_time,
@@ -1832,7 +1841,7 @@ def create_fallback_blueprint(video_path: str) -> StyleBlueprint:
         current_time = end_time
         segment_id += 1
     
-    return StyleBlueprint(total_duration=duration, segments=segments)
+    return StyleBlueprint(total_duration=duration, segments=SEGMENTS_ADAPTER.validate_python(segments))
 
 
 # ============================================================================
@@ -1889,7 +1898,7 @@ def create_mock_blueprint(video_path: str, segment_count: int = 8) -> StyleBluep
     current_time = 0.0
     for i in range(segment_count):
         end_time = min(current_time + segment_duration, duration)
-        segments.append(Segment(
+        segments.append(dict(
             id=i + 1,
             start=round(current_time, 2),
             end=round(end_time, 2),
@@ -1899,6 +1908,7 @@ def create_mock_blueprint(video_path: str, segment_count: int = 8) -> StyleBluep
         ))
         current_time = end_time
     
+    segments = SEGMENTS_ADAPTER.validate_python(segments)
     blueprint = StyleBlueprint(total_duration=duration, segments=segments)
     print(f"[MOCK] Created: {len(segments)} segments, {duration:.2f}s total")
     return blueprint
@@ -1922,7 +1932,7 @@ def create_mock_clip_index(clip_paths: List[str]) -> ClipIndex:
     
     from engine.processors import get_video_duration
     
-    clips = []
+    clip_dicts = []
     for i, clip_path in enumerate(clip_paths):
         duration = get_video_duration(clip_path)
         
@@ -1942,21 +1952,20 @@ def create_mock_clip_index(clip_paths: List[str]) -> ClipIndex:
                 start = 0.0  # Beginning (usually calm)
             
             end = min(start + 2.5, duration)
-            best_moments[level] = BestMoment(
-                start=round(start, 1),
-                end=round(end, 1),
-                reason=f"Mock {level} moment for testing"
-            )
+            best_moments[level] = {
+                "start": round(start, 1),
+                "end": round(end, 1),
+                "reason": f"Mock {level} moment for testing"
+            }
         
-        clip = ClipMetadata(
-            filename=Path(clip_path).name,
-            filepath=clip_path,
-            duration=duration,
-            energy=energy,
-            motion=motion,
-            best_moments=best_moments
-        )
-        clips.append(clip)
-        print(f"  [MOCK] {clip.filename}: {energy.value}/{motion.value}")
-    
-    return ClipIndex(clips=clips)
+        clip_dicts.append({
+            "filename": Path(clip_path).name,
+            "filepath": clip_path,
+            "duration": duration,
+            "energy": energy,
+            "motion": motion,
+            "best_moments": best_moments
+        })
+        print(f"  [MOCK] {Path(clip_path).name}: {energy.value}/{motion.value}")
+    
+    return ClipIndex(clips=CLIPS_ADAPTER.validate_python(clip_dicts))
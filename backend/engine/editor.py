@@ -344,6 +344,13 @@ def match_clips_to_blueprint(
     # Track usage: how many times each clip has been used
     clip_usage_count = {clip.filename: 0 for clip in clip_index.clips}
     
+    # Lookups by filename / filepath (first clip wins, like the linear scans they replace)
+    clips_by_filename = {}
+    clips_by_path = {}
+    for c in clip_index.clips:
+        clips_by_filename.setdefault(c.filename, c)
+        clips_by_path.setdefault(c.filepath, c)
+    
     # Track current position in each clip (for sequential fallback)
     clip_current_position = {clip.filename: 0.0 for clip in clip_index.clips}
     
@@ -396,6 +403,17 @@ def match_clips_to_blueprint(
                     canonical.add(key)
         return canonical
 
+    # canonicalize() is pure and scoring asks for the same descriptor lists (per clip,
+    # per segment vibe) on every cut, so memoize on the tuple for this match run
+    canonical_cache = {}
+
+    def canonicalize_cached(raw_vibe_list):
+        key = tuple(raw_vibe_list)
+        cached = canonical_cache.get(key)
+        if cached is None:
+            cached = canonical_cache[key] = canonicalize(key)
+        return cached
+
     # === PHRASE GROUPING (v12.4 Phase 2) ===
     # Groups segments by arc_stage for motif feasibility checks.
     # We derive these on the fly to avoid breaking legacy blueprint models.
@@ -572,10 +590,7 @@ def match_clips_to_blueprint(
         if advisor_moment_plan and advisor_moment_plan.moments:
             for moment in advisor_moment_plan.moments:
                 # Find the clip
-                selected_clip = next(
-                    (c for c in clip_index.clips if c.filename == moment.clip_filename),
-                    None
-                )
+                selected_clip = clips_by_filename.get(moment.clip_filename)
                 if not selected_clip:
                     print(f"    [WARN] Advisor-recommended clip {moment.clip_filename} not found")
                     continue
@@ -620,6 +635,11 @@ def match_clips_to_blueprint(
             # Skip the rest of the loop for this segment - Advisor handled it
             continue
         
+        # Arc-stage guidance is fixed for the whole segment: look it up once here
+        # rather than per cut and per scored clip
+        stage_guidance = advisor_hints.arc_stage_guidance.get(segment.arc_stage) if advisor_hints else None
+        stage_recommended_clips = frozenset(stage_guidance.recommended_clips) if stage_guidance else frozenset()
+        
         while segment_remaining > 0.05 and cuts_in_segment < max_cuts_per_segment:
             # Update remaining duration based on current timeline position
             segment_remaining = max(0.0, segment.end - timeline_position)
@@ -632,7 +652,7 @@ def match_clips_to_blueprint(
             # we bypass segment.energy filtering to allow the "correct" clips.
             active_energy_requirement = segment.energy
             if advisor_hints:
-                guidance = advisor_hints.arc_stage_guidance.get(segment.arc_stage)
+                guidance = stage_guidance
                 if guidance and guidance.required_energy:
                     try:
                         active_energy_requirement = EnergyLevel[guidance.required_energy.upper()]
@@ -896,14 +916,14 @@ def match_clips_to_blueprint(
                 required_energy_override = None
                 
                 if advisor:
-                    guidance = advisor.arc_stage_guidance.get(segment.arc_stage)
+                    guidance = stage_guidance
                     if guidance:
                         # Check if Advisor specifies required energy override
                         if guidance.required_energy:
                             required_energy_override = guidance.required_energy
                         
                         # Check if this clip is explicitly recommended
-                        if guidance.recommended_clips and clip.filename in guidance.recommended_clips:
+                        if clip.filename in stage_recommended_clips:
                             # This clip is explicitly recommended by Advisor for this arc stage
                             advisor_primary_carrier = True
                             # P0 FIX #2: INCREASED from 40 to ensure Advisor guidance wins
@@ -930,8 +950,8 @@ def match_clips_to_blueprint(
                 target_vibe = (segment.vibe or "general").lower()
                 
                 # Canonicalize both sides
-                target_canonical = canonicalize([target_vibe])
-                clip_canonical = canonicalize(clip_descriptors)
+                target_canonical = canonicalize_cached((target_vibe,))
+                clip_canonical = canonicalize_cached(clip_descriptors)
                 
                 # 1. Direct Canonical Match (+100.0 points) - HIGH PRIORITY
                 if any(tc in clip_canonical for tc in target_canonical):
@@ -1564,8 +1584,8 @@ def match_clips_to_blueprint(
                     switched_moment = False
                     
                     # Retrieve the full BestMoment object for stable_moment check
-                    if selected_clip.best_moments and segment.energy.value in selected_clip.best_moments:
-                        moment_obj = selected_clip.best_moments[segment.energy.value]
+                    if selected_clip.best_moments:
+                        moment_obj = selected_clip.best_moments.get(segment.energy.value)
                         
                     if (mode == "REFERENCE" and 
                         cut_origin == "visual" and 
@@ -1686,7 +1706,7 @@ def match_clips_to_blueprint(
                 # Extend the previous cut to fill the remaining gap
                 prev_decision = decisions[-1]
                 prev_clip_path = prev_decision.clip_path
-                prev_clip = next((c for c in clip_index.clips if c.filepath == prev_clip_path), None)
+                prev_clip = clips_by_path.get(prev_clip_path)
                 
                 if prev_clip:
                     extension_needed = segment_remaining_now
@@ -1765,7 +1785,7 @@ def match_clips_to_blueprint(
                 if decisions and decisions[-1].segment_id == segment.id:
                     # Find the clip to check duration
                     clip_path = decisions[-1].clip_path
-                    clip = next((c for c in clip_index.clips if c.filepath == clip_path), None)
+                    clip = clips_by_path.get(clip_path)
                     extra = segment.end - decisions[-1].timeline_end
                     
                     if clip and (decisions[-1].clip_end + extra) <= (clip.duration + 0.002):
@@ -2015,9 +2035,15 @@ def match_clips_to_blueprint(
         # Calculate gaps
         needed_vibes = set()
         needed_energies = set()
+        # One pass over the decisions instead of two scans per segment
+        filled_ids = set()
+        unmatched_ids = set()
+        for d in edl.decisions:
+            filled_ids.add(d.segment_id)
+            if not d.vibe_match:
+                unmatched_ids.add(d.segment_id)
         for seg in blueprint.segments:
-            seg_filled = any(d.segment_id == seg.id for d in edl.decisions)
-            if not seg_filled or any(d.segment_id == seg.id and not d.vibe_match for d in edl.decisions):
+            if seg.id not in filled_ids or seg.id in unmatched_ids:
                 if seg.vibe:
                     for v in seg.vibe.split(','):
                         needed_vibes.add(v.strip().lower())
@@ -18,9 +18,7 @@ from models import (
     ClipMetadata,
     Segment,
     AdvisorHints,
-    ArcStageGuidance,
-    LibraryAssessment,
-    CreativeAudit
+    ArcStageGuidance
 )
 from engine.gemini_advisor_prompt import ADVISOR_PROMPT
 from engine.brain import initialize_gemini, _parse_json_response, GeminiConfig, rate_limiter, _handle_rate_limit_error
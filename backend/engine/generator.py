@@ -12,12 +12,12 @@ v14.7 PROMPT MODE ENHANCEMENTS:
 - Fallback blueprint for graceful degradation
 """
 
-import json
 import hashlib
 import time
 from typing import Optional
 from pathlib import Path
 from models import StyleBlueprint, EnergyLevel, MotionType, Segment
+from utils import write_json_atomic
 from engine.brain import initialize_gemini, _parse_json_response, GeminiConfig, rate_limiter, _handle_rate_limit_error
 
 # ============================================================================
@@ -402,10 +402,10 @@ def generate_blueprint_from_text(
     # 1. Check Cache (Deterministic execution)
     if cache_file.exists():
         try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # Validate straight from the file bytes (pydantic-core JSON parser)
+            blueprint = StyleBlueprint.model_validate_json(cache_file.read_bytes())
             print(f"  [CACHE] Hit! Reusing synthesized blueprint: {cache_file.name}")
-            return StyleBlueprint(**data)
+            return blueprint
         except Exception as e:
             print(f"  [WARN] Failed to load cached blueprint: {e}")
     
@@ -491,8 +491,7 @@ Since no BPM is provided, focus on visual rhythm and story arc.
             
             # Save to Cache immediately
             try:
-                with open(cache_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
+                write_json_atomic(cache_file, data, indent=True)
                 print(f"  [CACHE] Saved new blueprint synthesis: {cache_file.name}")
             except Exception as e:
                 print(f"  [WARN] Failed to save blueprint cache: {e}")
@@ -352,17 +352,18 @@ def run_mimic_pipeline(
         except Exception as e:
             print(f"[ERROR] Gemini clip analysis failed: {e}")
             print("    FALLING BACK to default energy levels. Edit quality will be reduced.")
-            from models import ClipMetadata, EnergyLevel, MotionType
+            from models import CLIPS_ADAPTER, EnergyLevel, MotionType
             
-            clips = []
-            for path in clip_paths:
-                clips.append(ClipMetadata(
-                    filename=Path(path).name,
-                    filepath=path,
-                    duration=get_video_duration(path),
-                    energy=EnergyLevel.MEDIUM,
-                    motion=MotionType.DYNAMIC
-                ))
+            clips = CLIPS_ADAPTER.validate_python([
+                {
+                    "filename": Path(path).name,
+                    "filepath": path,
+                    "duration": get_video_duration(path),
+                    "energy": EnergyLevel.MEDIUM,
+                    "motion": MotionType.DYNAMIC
+                }
+                for path in clip_paths
+            ])
             clip_index = ClipIndex(clips=clips)
             
         # 2. Standardize clips for rendering (with persistent caching)
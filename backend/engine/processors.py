@@ -5,6 +5,7 @@ All functions here are PURE: they take input paths, produce output files,
 and have no side effects. They do NOT manage state or session data.
 """
 
+import asyncio
 import subprocess
 import json
 from pathlib import Path
@@ -647,6 +648,29 @@ def create_silent_video(input_path: str, output_path: str) -> None:
 # THUMBNAIL GENERATION (NEW)
 # ============================================================================
 
+def _thumbnail_offsets(time: float, duration: float) -> List[float]:
+    """Candidate seek offsets for a thumbnail frame: requested time, 5.0s, 0.5s, 0.0s."""
+    return [offset for offset in [time, 5.0, 0.5, 0.0] if not (duration > 0 and offset > duration)]
+
+
+def _thumbnail_cmd(video_path: str, thumbnail_path: str, offset: float) -> List[str]:
+    return [
+        "ffmpeg", "-v", "error",
+        "-ss", str(offset),
+        "-threads", "2",
+        "-i", video_path,
+        "-frames:v", "1",
+        "-an", "-sn",
+        "-q:v", "4",
+        "-y",
+        thumbnail_path
+    ]
+
+
+def _thumbnail_ok(thumbnail_path: str) -> bool:
+    return Path(thumbnail_path).exists() and Path(thumbnail_path).stat().st_size > 2000
+
+
 def generate_thumbnail(video_path: str, thumbnail_path: str, time: float = 2.0) -> bool:
     """
     Extract a single frame from video to use as thumbnail.
@@ -660,30 +684,97 @@ def generate_thumbnail(video_path: str, thumbnail_path: str, time: float = 2.0)
         duration = 0
 
     # Try multiple offsets: 2.0s, 5.0s, 0.5s, 0.0s
-    for offset in [time, 5.0, 0.5, 0.0]:
-        if duration > 0 and offset > duration:
+    for offset in _thumbnail_offsets(time, duration):
+        try:
+            subprocess.run(_thumbnail_cmd(video_path, thumbnail_path, offset), check=True, capture_output=True)
+            if _thumbnail_ok(thumbnail_path):
+                return True
+        except Exception:
             continue
             
-        cmd = [
-            "ffmpeg", "-v", "error",
-            "-ss", str(offset),
-            "-i", video_path,
-            "-frames:v", "1",
-            "-q:v", "4",
-            "-y",
-            thumbnail_path
-        ]
+    return False
+
+
+async def generate_thumbnail_async(video_path: str, thumbnail_path: str, time: float = 2.0) -> bool:
+    """
+    Async variant of generate_thumbnail() that drives ffprobe/ffmpeg as asyncio
+    subprocesses, so the event loop keeps serving requests while frames extract.
+    Falls back to the blocking version in a worker thread on loops without
+    subprocess support (e.g. the Windows selector loop).
+    """
+    Path(thumbnail_path).parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        probe = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", video_path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+    except NotImplementedError:
+        return await asyncio.to_thread(generate_thumbnail, video_path, thumbnail_path, time)
+    except Exception:
+        probe = None
+
+    duration = 0
+    if probe is not None:
+        stdout, _ = await probe.communicate()
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
-            if Path(thumbnail_path).exists() and Path(thumbnail_path).stat().st_size > 2000:
+            duration = float(json.loads(stdout)["format"]["duration"])
+        except Exception:
+            duration = 0
+
+    for offset in _thumbnail_offsets(time, duration):
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *_thumbnail_cmd(video_path, thumbnail_path, offset),
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            if await proc.wait() == 0 and _thumbnail_ok(thumbnail_path):
                 return True
         except Exception:
             continue
-            
+
     return False
 
 
+# Streams every browser can play from an MP4 without re-encoding
+_COPYABLE_AUDIO_CODECS = {"aac", "mp3"}
+
+
+def _is_browser_safe_h264(input_path: str) -> bool:
+    """
+    True if the first video stream is 8-bit 4:2:0 H.264 and the first audio
+    stream (if any) is AAC/MP3 - the only inputs a stream-copy remux may keep.
+    HEVC, VP9 or 10-bit H.264 would mux into MP4 fine but not play everywhere.
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "stream=codec_type,codec_name,pix_fmt",
+        "-of", "json",
+        input_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        streams = json.loads(result.stdout).get("streams", [])
+    except Exception:
+        return False
+
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video is None or video.get("codec_name") != "h264" or video.get("pix_fmt") != "yuv420p":
+        return False
+    return audio is None or audio.get("codec_name") in _COPYABLE_AUDIO_CODECS
+
+
 def convert_to_mp4(input_path: str, output_path: str) -> None:
+    """
+    Convert a video to MP4. Browser-safe H.264 (plus AAC/MP3 audio) inside
+    .mov/.mkv just needs a new container, so it is stream-copied; anything
+    else - or a remux that fails - is re-encoded to libx264/AAC.
+    """
+    if _is_browser_safe_h264(input_path) and _remux_to_mp4(input_path, output_path):
+        return
+
     cmd = [
         "ffmpeg",
         "-i", input_path,
@@ -703,6 +794,21 @@ def convert_to_mp4(input_path: str, output_path: str) -> None:
         raise RuntimeError(f"MP4 conversion failed: {stderr}")
 
 
+def _remux_to_mp4(input_path: str, output_path: str) -> bool:
+    """Stream-copy the first video/audio streams into an MP4. Returns True on success."""
+    remux_cmd = [
+        "ffmpeg", "-v", "error",
+        "-i", input_path,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-c", "copy",
+        "-movflags", "+faststart",
+        "-y",
+        output_path
+    ]
+    remux = subprocess.run(remux_cmd, capture_output=True, text=True)
+    return remux.returncode == 0 and Path(output_path).exists() and Path(output_path).stat().st_size > 0
+
+
 # ============================================================================
 # VALIDATION
 # ============================================================================
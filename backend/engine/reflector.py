@@ -201,8 +201,8 @@ def generate_vault_report(
 
     if not force_refresh and report_file.exists():
         try:
-            data = json.loads(report_file.read_text(encoding='utf-8'))
-            return VaultReport(**data)
+            # Cache was written by model_dump_json: validate straight from bytes
+            return VaultReport.model_validate_json(report_file.read_bytes())
         except Exception:
             pass
 
@@ -310,8 +310,7 @@ def reflect_on_edit(
     if not force_refresh and cache_file.exists():
         try:
             print(f"  📦 Loading cached Director's Critique...")
-            data = json.loads(cache_file.read_text(encoding='utf-8'))
-            return DirectorCritique(**data)
+            return DirectorCritique.model_validate_json(cache_file.read_bytes())
         except Exception as e:
             print(f"  ⚠️ Critique cache corrupted: {e}")
 
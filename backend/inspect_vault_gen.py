@@ -1,4 +1,3 @@
-import json
 import hashlib
 from pathlib import Path
 from models import PipelineResult, DirectorCritique
@@ -27,8 +26,7 @@ def generate_single_vault_artifact(filename: str):
     )
 
     try:
-        data = json.loads(rf.read_text(encoding='utf-8'))
-        result = PipelineResult.model_validate(data)
+        result = PipelineResult.model_validate_json(rf.read_bytes())
         
         if not result.success or not result.blueprint or not result.edl or not result.advisor:
             print(f"Result file {filename} is missing required data for Vault generation.")
@@ -5,25 +5,39 @@ Handles file uploads, Gemini 3 processing, and video rendering.
 
 import os
 import sys
-from fastapi import FastAPI, UploadFile, File, WebSocket, HTTPException, BackgroundTasks, Body, Query
+import atexit
+from fastapi import FastAPI, UploadFile, File, WebSocket, HTTPException, BackgroundTasks, Body, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from fastapi.responses import Response, FileResponse, StreamingResponse, JSONResponse, ORJSONResponse
+import anyio
 import mimetypes
 from fastapi.staticfiles import StaticFiles
 import uuid
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple, Mapping, BinaryIO
+from types import MappingProxyType
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 import json
+import re
 import hashlib
 import time
+import threading
+import functools
+from collections import OrderedDict
+from stat import S_ISREG
+from urllib.parse import quote
+from operator import itemgetter
 
 from dotenv import load_dotenv
 from models import *
 from engine.orchestrator import run_mimic_pipeline
-from engine.processors import generate_thumbnail, convert_to_mp4
-from utils import ensure_directory, cleanup_session, get_file_hash, get_bytes_hash, register_file_hash, save_hash_registry
+from engine.brain import CLIP_CACHE_VERSION, REFERENCE_CACHE_VERSION
+from engine.processors import generate_thumbnail, generate_thumbnail_async, convert_to_mp4
+from engine.stylist import apply_visual_styling
+from utils import ensure_directory, cleanup_session, get_file_hash, register_file_hash, save_hash_registry, SampledHasher, copy_and_hash, clone_file, new_session_hasher, content_hexdigest, load_json, loads_json, dump_json_bytes, write_json_atomic
 
 # Load environment variables
 load_dotenv()
@@ -61,7 +75,13 @@ REF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 CRITIQUE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title="MIMIC API", version="1.0.0")
+try:
+    import orjson
+except ImportError:  # Optional accelerator - stdlib json is the fallback
+    orjson = None
+
+# orjson renders API responses when installed (library listings, session state)
+app = FastAPI(title="MIMIC API", version="1.0.0", default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 
 # CORS for Next.js frontend - Apply Fix 1 from Section 9.5
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -84,12 +104,152 @@ app.add_middleware(
 # Track active sessions
 active_sessions = {}
 session_locks: Dict[str, asyncio.Lock] = {} # Lock for each session to prevent race conditions
-video_exts = {".mp4", ".mov", ".avi", ".mpg", ".mpeg", ".3gp", ".m4v", ".mkv"}
+video_exts = frozenset({".mp4", ".mov", ".avi", ".mpg", ".mpeg", ".3gp", ".m4v", ".mkv"})
+VIDEO_EXTS_MSG = ", ".join(sorted(video_exts)) # Precomputed for validation errors
+
+def file_ext(name: str) -> str:
+    """Lower-cased extension, same as Path(name).suffix.lower() without building a Path."""
+    i = name.rfind(".")
+    if i <= name.rfind("/") + 1:
+        return "" # No dot, or a leading-dot name like ".mp4"
+    return name[i:].lower()
+
+@functools.lru_cache(maxsize=64)
+def media_type_for_ext(ext: str) -> str:
+    """Content type for a (lower-cased) extension, memoized - the library only has a handful."""
+    return mimetypes.guess_type("x" + ext)[0] or "application/octet-stream"
+# Pipeline stdout lines kept for the WS/UI log: warnings/errors/progress and
+# top-level pipeline markers
+WS_LOG_KEEP_PREFIXES = ("[PROGRESS]", "[PIPELINE]", "[GENERATE]", "[WARN]", "[ERROR]", "[OK]", "✅", "❌")
+# Progress push: pipeline threads wake connected sockets instead of sockets
+# polling. Bursts are coalesced to one message per WS_PUSH_INTERVAL; an idle
+# socket still gets a heartbeat every WS_HEARTBEAT_INTERVAL.
+WS_PUSH_INTERVAL = 0.1
+WS_HEARTBEAT_INTERVAL = 15.0
+_progress_watchers: dict[str, set] = {} # session_id -> {(loop, asyncio.Event)}
+_ws_log_lock = threading.Lock() # Keeps a session's logs and log_count consistent
+
+def notify_progress(session_id: str):
+    """Wake WebSocket senders for a session. Safe to call from pipeline threads."""
+    for loop, event in tuple(_progress_watchers.get(session_id, ())):
+        if not event.is_set():
+            loop.call_soon_threadsafe(event.set)
+
+def read_new_logs(session: dict, sent: int) -> Tuple[List[str], int, int]:
+    """
+    Lines appended since absolute line number `sent`.
+    Returns (lines, offset of the first returned line, new absolute total).
+    """
+    with _ws_log_lock:
+        logs = session.get("logs", [])
+        total = session.get("log_count", len(logs))
+        first = total - len(logs) # Older lines were trimmed from the front
+        if sent > total:
+            sent = 0 # Logs were reset for a new iteration
+        start = max(sent, first)
+        return logs[start - first:], start, total
+
+UPLOAD_CONCURRENCY = min(os.cpu_count() or 4, 8) # Clips spooled/placed at once per upload
+# One process-lifetime pool for index work (directory scans, hashing, intel parsing),
+# kept apart from the default executor that FastAPI uses for sync endpoints.
+INDEX_EXECUTOR = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) + 4), thread_name_prefix="mimic-idx")
+atexit.register(INDEX_EXECUTOR.shutdown, wait=False)
+
+def run_in_index_executor(func, *args):
+    """Run a blocking index helper on INDEX_EXECUTOR from the current event loop."""
+    return asyncio.get_running_loop().run_in_executor(INDEX_EXECUTOR, func, *args)
+
+# Background Thumbnails: refreshes only queue missing thumbnails; two workers
+# drain the queue so listings never wait on ffmpeg. Until a thumbnail lands,
+# its URL 404s and the frontend shows a placeholder.
+THUMB_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mimic-thumb")
+atexit.register(THUMB_EXECUTOR.shutdown, wait=False, cancel_futures=True)
+# Upload thumbnails run inline as async ffmpeg subprocesses; one process-wide
+# limit keeps concurrent uploads from multiplying the ffmpeg count.
+UPLOAD_THUMBNAIL_CONCURRENCY = min(os.cpu_count() or 4, 8)
+_upload_thumb_sem = asyncio.Semaphore(UPLOAD_THUMBNAIL_CONCURRENCY)
+_queued_thumbnails: set[str] = set()
+_queued_thumbnails_lock = threading.Lock()
+
+# In-flight Thumbnails: thumb_{hash}.jpg is shared by every file with that content,
+# so concurrent requests for one name (upload, background queue, post-render)
+# wait on a single ffmpeg run. Thread futures, so pipeline threads can join too.
+_thumbs_in_flight: dict[str, Future] = {}
+_thumbs_in_flight_lock = threading.Lock()
+
+def _claim_thumbnail(thumb_path: str) -> Tuple[Future, bool]:
+    """Return (future, owner). Only the owner generates; everyone else waits on the future."""
+    with _thumbs_in_flight_lock:
+        future = _thumbs_in_flight.get(thumb_path)
+        if future is not None:
+            return future, False
+        future = Future()
+        _thumbs_in_flight[thumb_path] = future
+        return future, True
+
+def _release_thumbnail(thumb_path: str, future: Future, ok: bool):
+    with _thumbs_in_flight_lock:
+        _thumbs_in_flight.pop(thumb_path, None)
+    future.set_result(ok)
+
+def generate_thumbnail_once(video_path: str, thumb_path: str) -> bool:
+    """Blocking thumbnail generation, coalesced with any in-flight run for the same file."""
+    if os.path.exists(thumb_path):
+        return True
+    future, owner = _claim_thumbnail(thumb_path)
+    if not owner:
+        return future.result()
+    ok = False
+    try:
+        ok = generate_thumbnail(video_path, thumb_path)
+        return ok
+    finally:
+        _release_thumbnail(thumb_path, future, ok)
+
+async def ensure_thumbnail(video_path: str, thumb_path: str) -> bool:
+    """Async counterpart of generate_thumbnail_once() using ffmpeg subprocesses."""
+    if os.path.exists(thumb_path):
+        return True
+    future, owner = _claim_thumbnail(thumb_path)
+    if not owner:
+        return await asyncio.wrap_future(future)
+    ok = False
+    try:
+        ok = await generate_thumbnail_async(video_path, thumb_path)
+        return ok
+    finally:
+        _release_thumbnail(thumb_path, future, ok)
+
+def _generate_queued_thumbnail(video_path: str, thumb_path: str):
+    try:
+        # Re-checked inside: identical content shares one thumbnail
+        generate_thumbnail_once(video_path, thumb_path)
+    except Exception as te:
+        print(f"[THUMB] Failed for {Path(video_path).name}: {te}")
+    finally:
+        with _queued_thumbnails_lock:
+            _queued_thumbnails.discard(thumb_path)
+
+def queue_thumbnail(video_path: str, thumb_path: str):
+    """Queue a thumbnail for background extraction unless it is already pending."""
+    with _queued_thumbnails_lock:
+        if thumb_path in _queued_thumbnails:
+            return
+        _queued_thumbnails.add(thumb_path)
+    THUMB_EXECUTOR.submit(_generate_queued_thumbnail, video_path, thumb_path)
 
 # ============================================================================
 # STATE MANAGEMENT (V12.0)
 # ============================================================================
 
+# Persisted state is written at most once per PERSIST_INTERVAL. Indented JSON is
+# only emitted when MIMIC_DEBUG_JSON is set, for human inspection.
+PERSIST_INTERVAL = 0.5
+PRETTY_STATE_JSON = os.getenv("MIMIC_DEBUG_JSON", "").lower() in ("1", "true", "yes")
+_pending_saves: set[str] = set()
+_persist_loop: Optional[asyncio.AbstractEventLoop] = None
+_persist_wakeup: Optional[asyncio.Event] = None
+
 # Conversion Mapping (v11.8): Track original source hashes to their converted MP4 paths
 SOURCE_MAP_PATH = CACHE_DIR / "source_map.json"
 source_map = {}
@@ -98,43 +258,291 @@ def load_source_map():
     global source_map
     if SOURCE_MAP_PATH.exists():
         try:
-            with open(SOURCE_MAP_PATH, "r", encoding="utf-8") as f:
-                source_map = json.load(f)
+            source_map = load_json(SOURCE_MAP_PATH)
         except Exception as e:
             print(f"[WARN] Failed to load source_map: {e}")
             source_map = {}
 
 def save_source_map():
     try:
-        with open(SOURCE_MAP_PATH, "w", encoding="utf-8") as f:
-            json.dump(source_map, f, indent=2)
+        # Snapshot first: upload workers may add entries while this serializes
+        write_json_atomic(SOURCE_MAP_PATH, dict(source_map), indent=PRETTY_STATE_JSON)
     except Exception as e:
         print(f"[WARN] Failed to save source_map: {e}")
 
 # Session Persistence (v12.1): Track active sessions across restarts
+# Each mutation appends one JSONL event to SESSIONS_LOG_PATH; the snapshot in
+# SESSIONS_PATH is only rewritten by compact_sessions().
 SESSIONS_PATH = CACHE_DIR / "active_sessions.json"
+SESSIONS_LOG_PATH = SESSIONS_PATH.with_suffix(".log")
+SESSION_COMPACT_INTERVAL = 300  # seconds
+_session_log_lock = threading.Lock()
+
+def _replay_session_log():
+    """Apply logged session events on top of the loaded snapshot."""
+    if not SESSIONS_LOG_PATH.exists():
+        return 0
+    applied = 0
+    with open(SESSIONS_LOG_PATH, "rb") as f:
+        for line in f:
+            try:
+                event = loads_json(line)
+            except ValueError:
+                # Torn trailing line from a crash mid-append - everything before it is intact
+                print("[WARN] Skipping unreadable session log entry")
+                continue
+            kind, sid, payload = event["k"], event["s"], event.get("p")
+            if kind == "put":
+                active_sessions[sid] = payload
+            elif kind == "update" and sid in active_sessions:
+                active_sessions[sid].update(payload)
+            elif kind == "delete":
+                active_sessions.pop(sid, None)
+            applied += 1
+    return applied
 
 def load_active_sessions():
     global active_sessions
     if SESSIONS_PATH.exists():
         try:
-            with open(SESSIONS_PATH, "r", encoding="utf-8") as f:
-                active_sessions = json.load(f)
-                print(f"[RECOVERY] Restored {len(active_sessions)} active sessions from disk.")
+            active_sessions = load_json(SESSIONS_PATH)
         except Exception as e:
             print(f"[WARN] Failed to load sessions: {e}")
             active_sessions = {}
+    try:
+        replayed = _replay_session_log()
+    except Exception as e:
+        print(f"[WARN] Failed to replay session log: {e}")
+        replayed = 0
+    if active_sessions:
+        print(f"[RECOVERY] Restored {len(active_sessions)} active sessions from disk ({replayed} logged events).")
 
-def save_active_sessions():
+def append_session_event(kind: str, sid: str, payload: Optional[dict] = None):
+    """
+    Persist one session mutation ("put", "update" or "delete").
+    Safe to call from the pipeline worker thread.
+    """
+    line = dump_json_bytes({"k": kind, "s": sid, "p": payload}) + b"\n"
     try:
-        # We don't save the locks, they are ephemeral
-        with open(SESSIONS_PATH, "w", encoding="utf-8") as f:
-            json.dump(active_sessions, f, indent=2)
+        with _session_log_lock:
+            with open(SESSIONS_LOG_PATH, "ab") as f:
+                f.write(line)
     except Exception as e:
-        print(f"[WARN] Failed to save sessions: {e}")
+        print(f"[WARN] Failed to log session event: {e}")
+
+def log_session_fields(sid: str, *keys: str):
+    """Log the current values of the given session fields as one "update" event."""
+    session = active_sessions[sid]
+    append_session_event("update", sid, {key: session.get(key) for key in keys})
+
+def compact_sessions():
+    """Fold the session log into a fresh snapshot and truncate the log."""
+    with _session_log_lock:
+        if not SESSIONS_LOG_PATH.exists():
+            return
+        try:
+            # We don't save the locks, they are ephemeral
+            write_json_atomic(SESSIONS_PATH, active_sessions, indent=PRETTY_STATE_JSON)
+            # Snapshot is durable; the events it covers can go
+            with open(SESSIONS_LOG_PATH, "wb"):
+                pass
+        except Exception as e:
+            print(f"[WARN] Failed to compact sessions: {e}")
+
+async def session_compaction_loop():
+    """Background task that compacts the session log every SESSION_COMPACT_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(SESSION_COMPACT_INTERVAL)
+        await asyncio.to_thread(compact_sessions)
+
+# Debounced Persistence: mutation paths only mark state dirty; a single
+# background flusher coalesces bursts (e.g. multi-clip uploads) into one write.
+_STATE_SAVERS = {
+    "source_map": save_source_map,
+}
+
+def schedule_save(name: str):
+    """Mark a persisted state file dirty. Safe to call from worker threads."""
+    _pending_saves.add(name)
+    loop = _persist_loop
+    if loop is None:
+        return # Flusher not running yet; shutdown still flushes
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        _persist_wakeup.set()
+    else:
+        loop.call_soon_threadsafe(_persist_wakeup.set)
+
+def flush_pending_saves():
+    while _pending_saves:
+        name = _pending_saves.pop()
+        _STATE_SAVERS[name]()
+
+async def persistence_flush_loop():
+    """
+    Background task that sleeps until state is marked dirty, lets the burst
+    settle for PERSIST_INTERVAL, then writes it out on a worker thread.
+    """
+    global _persist_loop, _persist_wakeup
+    _persist_wakeup = asyncio.Event()
+    _persist_loop = asyncio.get_running_loop()
+    if _pending_saves:
+        _persist_wakeup.set()
+    while True:
+        await _persist_wakeup.wait()
+        await asyncio.sleep(PERSIST_INTERVAL)
+        _persist_wakeup.clear()
+        await asyncio.to_thread(flush_pending_saves)
 
 load_source_map()
+class SessionTable:
+    """
+    Column store of the per-session fields /api/history lists.
+    Rows are kept in active_sessions order; logs, progress and other fast-changing
+    state stay in active_sessions itself.
+    """
+    def __init__(self):
+        self.ids: List[str] = []
+        self.status: List[str] = []
+        self.created: List[Any] = []
+        self.ref_name: List[str] = []
+        self.clip_count: List[int] = []
+        self.idx_of: Dict[str, int] = {}
+
+    def upsert(self, sid: str, session: dict):
+        ref_path = session.get("reference_path")
+        row = (
+            session.get("status", "uploaded"),
+            session.get("created_at", ""),
+            Path(ref_path).name if ref_path else "text_prompt",
+            len(session.get("clip_paths") or ()),
+        )
+        i = self.idx_of.get(sid)
+        if i is None:
+            self.idx_of[sid] = len(self.ids)
+            self.ids.append(sid)
+            for column, value in zip(self._columns(), row):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns(), row):
+                column[i] = value
+
+    def set_status(self, sid: str, status: str):
+        i = self.idx_of.get(sid)
+        if i is not None:
+            self.status[i] = status
+
+    def remove(self, sid: str):
+        i = self.idx_of.pop(sid, None)
+        if i is None:
+            return
+        del self.ids[i]
+        for column in self._columns():
+            del column[i]
+        for j in range(i, len(self.ids)):
+            self.idx_of[self.ids[j]] = j
+
+    def rebuild(self, sessions: dict):
+        self.__init__()
+        for sid, session in sessions.items():
+            self.upsert(sid, session)
+
+    def rows(self):
+        return zip(self.ids, self.status, self.created, self.ref_name, self.clip_count)
+
+    def _columns(self):
+        return (self.status, self.created, self.ref_name, self.clip_count)
+
+session_table = SessionTable()
+
+def set_session_status(session_id: str, status: str):
+    """Update a session's status in active_sessions and the history columns."""
+    active_sessions[session_id]["status"] = status
+    session_table.set_status(session_id, status)
+
 load_active_sessions()
+session_table.rebuild(active_sessions)
+
+_by_created_at = itemgetter("created_at")
+
+def session_tag(session_id: str) -> str:
+    """Session tag used in result filenames: {ref_name}_{tag}_v{iteration}.mp4"""
+    return session_id if len(session_id) < 12 else session_id[:12]
+
+def parse_result_iteration(stem: str) -> Optional[Tuple[str, int]]:
+    """Split a result stem into (session tag, iteration), or None if unversioned."""
+    head, sep, version = stem.rpartition("_v")
+    if not sep or not version.isdigit() or len(head) < 13 or head[-13] != "_":
+        return None
+    return head[-12:], int(version)
+
+# Typed Intel Decoding: the index reads 7 top-level keys from each clip contract.
+# With msgspec installed, everything else (segment tables, best moments) is
+# skipped during decode instead of being built into nested dicts.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    class _ClipIntelHeader(msgspec.Struct):
+        # UNSET defaults keep absent keys absent, so .get() fallbacks behave as before
+        legacy_cache_version: Any = msgspec.field(default=msgspec.UNSET, name="_cache_version")
+        cache_version: Any = msgspec.UNSET
+        vibes: Any = msgspec.UNSET
+        primary_subject: Any = msgspec.UNSET
+        content_description: Any = msgspec.UNSET
+        energy: Any = msgspec.UNSET
+        clip_quality: Any = msgspec.UNSET
+
+    _clip_intel_decoder = msgspec.json.Decoder(_ClipIntelHeader)
+    _CLIP_INTEL_KEYS = tuple(zip(_ClipIntelHeader.__struct_fields__, _ClipIntelHeader.__struct_encode_fields__))
+
+def load_clip_intel(path: Path) -> dict:
+    """Read the index-relevant fields of a clip_comprehensive_{hash}.json contract."""
+    if msgspec is None:
+        return load_json(path)
+    with open(path, "rb") as f:
+        header = _clip_intel_decoder.decode(f.read())
+    intel = {}
+    for attr, key in _CLIP_INTEL_KEYS:
+        value = getattr(header, attr)
+        if value is not msgspec.UNSET:
+            intel[key] = value
+    return intel
+
+# Reference intelligence file names: ref_{hash}_v{ver}_{hint tag}.json (and
+# legacy ref_{hash}_*.json). The name's version is NOT authoritative - brain.py
+# re-analyses into the existing file - so it only serves to group by hash.
+REF_CACHE_NAME_RE = re.compile(r"ref_(?P<hash>[^_]+)_.*\.json")
+
+# Top-level contract version key. Writers append it after the payload, so it
+# sits in the file's tail; the last match wins over any nested occurrence.
+_CACHE_VERSION_RE = re.compile(rb'"_cache_version"\s*:\s*"([^"\\]*)"')
+_VERSION_PEEK_BYTES = 2048
+
+def peek_cache_version(path: Path) -> str:
+    """
+    Read a cache file's version from its tail/head instead of parsing it all.
+    Falls back to a full parse for files without a plain "_cache_version" key.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 2 * _VERSION_PEEK_BYTES:
+            windows = (f.read(),)
+        else:
+            head = f.read(_VERSION_PEEK_BYTES)
+            f.seek(size - _VERSION_PEEK_BYTES)
+            windows = (f.read(), head)
+    for window in windows:
+        found = _CACHE_VERSION_RE.findall(window)
+        if found:
+            return found[-1].decode("utf-8")
+    data = load_json(path)
+    return data.get("_cache_version", data.get("cache_version", "0.0"))
 
 class LibraryIndex:
     """
@@ -142,18 +550,31 @@ class LibraryIndex:
     Prevents repeated O(N) filesystem scans on every request.
     Handles background thumbnail generation.
     """
-    _clips: List[dict] = []
-    _results: List[dict] = []
-    _references: List[dict] = []
+    # Immutable snapshots: safe to hand to concurrent readers without copying
+    _clips: Tuple[dict, ...] = ()
+    _results: Tuple[dict, ...] = ()
+    _references: Tuple[dict, ...] = ()
     _hashes: dict[str, Path] = {}
+    _reference_hashes: dict[str, Path] = {}
+    # Full-content session hash per reference: path -> (size, mtime_ns, hash).
+    # The sampled fingerprint only finds a candidate; this confirms it.
+    _reference_content: dict[str, tuple[int, int, str]] = {}
+    _session_iterations: dict[str, int] = {} # session tag -> highest result version on disk
+    # Per-file memo: path -> (size, mtime_ns, dependency stamp, meta, hash)
+    _meta_cache: dict[str, tuple] = {}
+    # Reference intelligence files by content hash: hash -> [(path, mtime)],
+    # valid while REF_CACHE_DIR's mtime still equals _ref_cache_stamp
+    _ref_cache_index: dict[str, list[tuple[Path, float]]] = {}
+    _ref_cache_stamp: Optional[int] = None
     
     _last_refresh: float = 0
     _refresh_interval: float = 30.0 # Refresh every 30 seconds if requested
     _lock = asyncio.Lock()
     _is_refreshing = False
+    _fetch_task: Optional[asyncio.Task] = None # Single-flight refresh shared by concurrent readers
 
     @classmethod
-    async def get_clips(cls, limit: int = None, offset: int = 0) -> List[dict]:
+    async def get_clips(cls, limit: int = None, offset: int = 0) -> Tuple[dict, ...]:
         await cls._ensure_fresh()
         data = cls._clips
         if limit is not None:
@@ -161,7 +582,7 @@ class LibraryIndex:
         return data
 
     @classmethod
-    async def get_results(cls, limit: int = None, offset: int = 0) -> List[dict]:
+    async def get_results(cls, limit: int = None, offset: int = 0) -> Tuple[dict, ...]:
         await cls._ensure_fresh()
         data = cls._results
         if limit is not None:
@@ -169,7 +590,7 @@ class LibraryIndex:
         return data
 
     @classmethod
-    async def get_references(cls, limit: int = None, offset: int = 0) -> List[dict]:
+    async def get_references(cls, limit: int = None, offset: int = 0) -> Tuple[dict, ...]:
         await cls._ensure_fresh()
         data = cls._references
         if limit is not None:
@@ -177,16 +598,40 @@ class LibraryIndex:
         return data
 
     @classmethod
-    async def get_hashes(cls) -> dict[str, Path]:
+    async def get_hashes(cls) -> Mapping[str, Path]:
+        await cls._ensure_fresh()
+        return MappingProxyType(cls._hashes)
+
+    @classmethod
+    async def get_reference_hashes(cls) -> Mapping[str, Path]:
+        await cls._ensure_fresh()
+        return MappingProxyType(cls._reference_hashes)
+
+    @classmethod
+    async def peek_iteration(cls, tag: str) -> Optional[int]:
+        """Highest rendered iteration for a session tag, or None before the first index build."""
         await cls._ensure_fresh()
-        return cls._hashes.copy()
+        if not cls._last_refresh:
+            return None
+        return cls._session_iterations.get(tag, 0)
+
+    @classmethod
+    def note_iteration(cls, tag: str, iteration: int):
+        """Record a freshly rendered result. Never lowers the counter, so deleted versions aren't reused."""
+        if iteration > cls._session_iterations.get(tag, 0):
+            cls._session_iterations[tag] = iteration
 
     @classmethod
     async def _ensure_fresh(cls):
         now = time.time()
-        if not cls._last_refresh or (now - cls._last_refresh > cls._refresh_interval):
-            if not cls._is_refreshing:
-                await cls._refresh()
+        if cls._last_refresh and (now - cls._last_refresh <= cls._refresh_interval):
+            return
+        if cls._fetch_task is None or cls._fetch_task.done():
+            if cls._is_refreshing:
+                return # The background loop is already rebuilding the index
+            cls._fetch_task = asyncio.create_task(cls._refresh())
+        # Shielded so a disconnecting client can't cancel the refresh other callers await
+        await asyncio.shield(cls._fetch_task)
 
     @classmethod
     def update_sync(cls, clip_hash: str, path: Path):
@@ -195,75 +640,224 @@ class LibraryIndex:
         # We don't fully rebuild the lists here to keep upload fast, 
         # a refresh will catch the metadata soon.
 
+    @classmethod
+    def update_reference_sync(cls, ref_hash: str, path: Path, content_hash: Optional[str] = None):
+        """Immediate manual update when a new reference is uploaded."""
+        cls._reference_hashes[ref_hash] = path
+        if content_hash:
+            try:
+                st = path.stat()
+            except OSError:
+                return
+            cls._reference_content[str(path)] = (st.st_size, st.st_mtime_ns, content_hash)
+
+    @classmethod
+    def reference_content_hash(cls, path: Path) -> str:
+        """
+        Full-content session hash of a reference (same digest as the upload's
+        ref_hash). Memoized per (size, mtime); a miss streams the whole file.
+        """
+        st = path.stat()
+        cached = cls._reference_content.get(str(path))
+        if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+            return cached[2]
+        hasher = new_session_hasher()
+        with open(path, "rb") as f:
+            copy_and_hash(f, None, hasher)
+        content_hash = content_hexdigest(hasher)
+        cls._reference_content[str(path)] = (st.st_size, st.st_mtime_ns, content_hash)
+        return content_hash
+
+    @classmethod
+    def get_ref_cache_entries(cls, ref_hash: str) -> list[tuple[Path, float]]:
+        """
+        Reference intelligence files for a content hash, newest listing only.
+        A directory stat revalidates the index; it is rebuilt only when files
+        were added, removed or renamed since the last scan.
+        """
+        try:
+            stamp = REF_CACHE_DIR.stat().st_mtime_ns
+        except OSError:
+            return []
+        if stamp != cls._ref_cache_stamp:
+            cls._ref_cache_index, cls._ref_cache_stamp = cls._build_ref_cache_index()
+        return cls._ref_cache_index.get(ref_hash, [])
+
+    @classmethod
+    def rename_sync(cls, src: Path, dst: Path):
+        """Repoint hash entries at a renamed file so dedup never returns a dead path."""
+        for hashes in (cls._hashes, cls._reference_hashes):
+            for h, path in hashes.items():
+                if path == src:
+                    hashes[h] = dst
+        content = cls._reference_content.pop(str(src), None)
+        if content:
+            cls._reference_content[str(dst)] = content
+
     @classmethod
     async def _refresh(cls):
-        async with cls._lock:
-            if cls._is_refreshing: return
-            cls._is_refreshing = True
+        # Only one refresh builds at a time; scanning and sorting run without the
+        # lock, which is held just for the swap so readers are never blocked long.
+        if cls._is_refreshing: return
+        cls._is_refreshing = True
+        
+        start_time = time.time()
+        print(f"[INDEX] Global Refresh Started...")
+        
+        try:
+            new_clips = []
+            new_results = []
+            new_references = []
+            new_hashes = {}
+            new_reference_hashes = {}
+            new_iterations = {}
+            clip_files, result_files, ref_files = [], [], []
+            # Metadata work runs on INDEX_EXECUTOR; missing thumbnails are queued
+            # One listing of the reference cache instead of a glob per reference
+            ref_index, ref_stamp = await run_in_index_executor(cls._build_ref_cache_index)
             
-            start_time = time.time()
-            print(f"[INDEX] Global Refresh Started...")
+            # 1. Scan Clips
+            if CLIPS_DIR.exists():
+                clip_files = await run_in_index_executor(cls._scan_videos, CLIPS_DIR)
+                results = await asyncio.gather(*[cls._process_file_async(p, "clip", file_stat=st) for p, st in clip_files])
+                for meta, p, h in results:
+                    if meta: 
+                        new_clips.append(meta)
+                        if h: new_hashes[h] = p
             
-            try:
-                new_clips = []
-                new_results = []
-                new_references = []
-                new_hashes = {}
-                
-                # 1. Scan Clips
-                if CLIPS_DIR.exists():
-                    clip_files = [p for p in CLIPS_DIR.glob("*.mp4") if p.is_file()]
-                    with ThreadPoolExecutor(max_workers=10) as executor:
-                        results = list(executor.map(lambda p: cls._process_file(p, "clip"), clip_files))
-                        for meta, p, h in results:
-                            if meta: 
-                                new_clips.append(meta)
-                                if h: new_hashes[h] = p
-                
-                # 2. Scan Results
-                if RESULTS_DIR.exists():
-                    result_files = [p for p in RESULTS_DIR.glob("*.mp4") if p.is_file()]
-                    with ThreadPoolExecutor(max_workers=10) as executor:
-                        results = list(executor.map(lambda p: cls._process_file(p, "result"), result_files))
-                        for meta, p, h in results:
-                            if meta: 
-                                new_results.append(meta)
-                                # We don't necessarily need results in the global clip hash index
-                
-                # 3. Scan References
-                if REFERENCES_DIR.exists():
-                    ref_files = [p for p in REFERENCES_DIR.glob("*.mp4") if p.is_file()]
-                    with ThreadPoolExecutor(max_workers=10) as executor:
-                        results = list(executor.map(lambda p: cls._process_file(p, "ref"), ref_files))
-                        for meta, p, h in results:
-                            if meta: 
-                                new_references.append(meta)
-
-                # Sort all by newest first
-                new_clips.sort(key=lambda x: x["created_at"], reverse=True)
-                new_results.sort(key=lambda x: x["created_at"], reverse=True)
-                new_references.sort(key=lambda x: x["created_at"], reverse=True)
-                
-                # Atomic Swap
+            # 2. Scan Results
+            if RESULTS_DIR.exists():
+                result_files = await run_in_index_executor(cls._scan_videos, RESULTS_DIR)
+                results = await asyncio.gather(*[cls._process_file_async(p, "result", file_stat=st) for p, st in result_files])
+                for meta, p, h in results:
+                    if meta: 
+                        new_results.append(meta)
+                        # We don't necessarily need results in the global clip hash index
+                    version = parse_result_iteration(p.stem)
+                    if version and version[1] > new_iterations.get(version[0], 0):
+                        new_iterations[version[0]] = version[1]
+            
+            # 3. Scan References
+            if REFERENCES_DIR.exists():
+                ref_files = await run_in_index_executor(cls._scan_videos, REFERENCES_DIR)
+                results = await asyncio.gather(*[cls._process_file_async(p, "ref", ref_index=ref_index, file_stat=st) for p, st in ref_files])
+                for meta, p, h in results:
+                    if meta: 
+                        new_references.append(meta)
+                        if h: new_reference_hashes[h] = p
+
+            # Drop memo entries for files that no longer exist
+            live_paths = {str(p) for p, _ in (*clip_files, *result_files, *ref_files)}
+            cls._meta_cache = {k: v for k, v in cls._meta_cache.items() if k in live_paths}
+            cls._reference_content = {k: v for k, v in cls._reference_content.items() if k in live_paths}
+
+            # Sort all by newest first
+            new_clips = tuple(sorted(new_clips, key=_by_created_at, reverse=True))
+            new_results = tuple(sorted(new_results, key=_by_created_at, reverse=True))
+            new_references = tuple(sorted(new_references, key=_by_created_at, reverse=True))
+            
+            # Atomic Swap
+            async with cls._lock:
                 cls._clips = new_clips
                 cls._results = new_results
                 cls._references = new_references
                 cls._hashes = new_hashes
+                cls._reference_hashes = new_reference_hashes
+                cls._ref_cache_index, cls._ref_cache_stamp = ref_index, ref_stamp
+                # Keep counters from renders the scan can no longer see (deleted versions)
+                for tag, iteration in cls._session_iterations.items():
+                    if iteration > new_iterations.get(tag, 0):
+                        new_iterations[tag] = iteration
+                cls._session_iterations = new_iterations
                 cls._last_refresh = time.time()
-                
-                save_hash_registry()
-                elapsed = time.time() - start_time
-                print(f"[INDEX] Refresh Complete ({elapsed:.2f}s). Index: {len(new_clips)} clips, {len(new_results)} results, {len(new_references)} refs.")
-                
-            except Exception as e:
-                print(f"[INDEX] Refresh Error: {e}")
-            finally:
-                cls._is_refreshing = False
+            
+            save_hash_registry()
+            elapsed = time.time() - start_time
+            print(f"[INDEX] Refresh Complete ({elapsed:.2f}s). Index: {len(new_clips)} clips, {len(new_results)} results, {len(new_references)} refs.")
+            
+        except Exception as e:
+            print(f"[INDEX] Refresh Error: {e}")
+        finally:
+            cls._is_refreshing = False
+
+    @staticmethod
+    def _dependency_stamp(p: Path, type_tag: str, h: str):
+        """
+        Cheap fingerprint of the side files a file's metadata depends on
+        (intelligence contract, reference cache, result sidecar). A change here
+        invalidates the memoized metadata even if the video itself is unchanged.
+        """
+        if type_tag == "clip":
+            intelligence_path = CLIP_CACHE_DIR / f"clip_comprehensive_{h}.json"
+            try:
+                return intelligence_path.stat().st_mtime_ns
+            except OSError:
+                return None
+        if type_tag == "ref":
+            return REF_CACHE_DIR.stat().st_mtime_ns
+        return p.with_suffix(".json").exists()
 
     @staticmethod
-    def _process_file(p: Path, type_tag: str):
-        """Helper to extract metadata and ensure thumbnail exists in a thread-safe way."""
+    def _scan_videos(directory: Path) -> list[tuple[Path, os.stat_result]]:
+        """
+        List *.mp4 files with their stat results in one scandir pass.
+        File type comes from the directory entry itself, and the single stat
+        per file is reused downstream instead of being re-issued.
+        """
+        found = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # normcase keeps glob's case-insensitive match on Windows
+                if os.path.normcase(entry.name).endswith(".mp4") and entry.is_file():
+                    found.append((Path(entry.path), entry.stat()))
+        return found
+
+    @staticmethod
+    def _build_ref_cache_index() -> tuple[dict[str, list[tuple[Path, float]]], Optional[int]]:
+        """
+        Group reference intelligence files (ref_{hash}_*.json) by content hash,
+        with their mtimes. Also returns the directory stamp taken before the scan.
+        """
+        ref_index: dict[str, list[tuple[Path, float]]] = {}
+        try:
+            stamp = REF_CACHE_DIR.stat().st_mtime_ns
+        except OSError:
+            return ref_index, None
+        with os.scandir(REF_CACHE_DIR) as entries:
+            for entry in entries:
+                match = REF_CACHE_NAME_RE.fullmatch(entry.name)
+                if match is None:
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                ref_index.setdefault(match["hash"], []).append((Path(entry.path), mtime))
+        return ref_index, stamp
+
+    @classmethod
+    async def _process_file_async(cls, p: Path, type_tag: str, ref_index: dict[str, list[tuple[Path, float]]] = None, file_stat: os.stat_result = None):
+        """Extract metadata off-loop, then queue the content-addressed thumbnail if missing."""
+        meta, p, h = await run_in_index_executor(cls._process_file, p, type_tag, ref_index, file_stat)
+        if meta and h:
+            thumb_path = THUMBNAILS_DIR / f"thumb_{h}.jpg"
+            if not thumb_path.exists():
+                queue_thumbnail(str(p), str(thumb_path))
+        return meta, p, h
+
+    @classmethod
+    def _process_file(cls, p: Path, type_tag: str, ref_index: dict[str, list[tuple[Path, float]]] = None, file_stat: os.stat_result = None):
+        """Helper to extract metadata in a thread-safe way."""
         try:
+            # 0. Memo Check: unchanged files (and side files) reuse last refresh's metadata
+            if file_stat is None:
+                file_stat = p.stat()
+            cached = cls._meta_cache.get(str(p))
+            if cached is not None:
+                size, mtime_ns, stamp, meta, h = cached
+                if size == file_stat.st_size and mtime_ns == file_stat.st_mtime_ns and stamp == cls._dependency_stamp(p, type_tag, h):
+                    return meta, p, h
+
             # 1. Identity Verification (Source of Truth)
             # v12.1: We must use content hash for identity unification
             h = get_file_hash(p)
@@ -273,16 +867,10 @@ class LibraryIndex:
             
             # 2. Thumbnail Linkage (Deterministic)
             # v12.1 Unified: Use a single content-based thumbnail for all views
+            # (generated by _process_file_async, outside the metadata memo)
             thumb_name = f"thumb_{h}.jpg"
-            thumb_path = THUMBNAILS_DIR / thumb_name
-            
-            if not thumb_path.exists():
-                try:
-                    generate_thumbnail(str(p), str(thumb_path))
-                except Exception as te:
-                    print(f"[THUMB] Failed for {p.name}: {te}")
 
-            stat = p.stat()
+            stat = file_stat
             meta = {
                 "filename": p.name,
                 "path": f"/api/files/{'samples/clips' if type_tag == 'clip' else 'results' if type_tag == 'result' else 'references'}/{p.name}",
@@ -300,45 +888,46 @@ class LibraryIndex:
                 intelligence_path = CLIP_CACHE_DIR / f"clip_comprehensive_{h}.json"
                 if intelligence_path.exists():
                     try:
-                        with open(intelligence_path, 'r', encoding='utf-8') as f:
-                            intel = json.load(f)
-                            # Verify Version Contract (v12.1 Invariant)
-                            cache_ver = intel.get("_cache_version", intel.get("cache_version", "0.0"))
-                            from engine.brain import CLIP_CACHE_VERSION
-                            
-                            if cache_ver == CLIP_CACHE_VERSION:
-                                meta["intelligence_status"] = "authoritative"
-                                meta["vibes"] = intel.get("vibes", [])
-                                meta["subjects"] = intel.get("primary_subject", [])
-                                meta["description"] = intel.get("content_description", "")
-                                meta["energy"] = intel.get("energy", "Unknown")
-                                meta["quality"] = intel.get("clip_quality", 0)
-                                meta["version"] = cache_ver
-                            else:
-                                meta["intelligence_status"] = "legacy"
-                                meta["version"] = cache_ver
+                        intel = load_clip_intel(intelligence_path)
+                        # Verify Version Contract (v12.1 Invariant)
+                        cache_ver = intel.get("_cache_version", intel.get("cache_version", "0.0"))
+                        
+                        if cache_ver == CLIP_CACHE_VERSION:
+                            meta["intelligence_status"] = "authoritative"
+                            meta["vibes"] = intel.get("vibes", [])
+                            meta["subjects"] = intel.get("primary_subject", [])
+                            meta["description"] = intel.get("content_description", "")
+                            meta["energy"] = intel.get("energy", "Unknown")
+                            meta["quality"] = intel.get("clip_quality", 0)
+                            meta["version"] = cache_ver
+                        else:
+                            meta["intelligence_status"] = "legacy"
+                            meta["version"] = cache_ver
                     except Exception as e:
                         print(f"[INDEX] ERR: Failed to read contract for {p.name}: {e}")
             
             elif type_tag == "ref":
                 # Find best matching reference intelligence
-                from engine.brain import REFERENCE_CACHE_VERSION
                 # v12.1 Refined pattern: catch vX and legacy formats
-                matches = list(REF_CACHE_DIR.glob(f"ref_{h}_*.json"))
+                if ref_index is not None:
+                    matches = ref_index.get(h, [])
+                else:
+                    matches = cls.get_ref_cache_entries(h)
                 if matches:
-                    # Sort candidates by version match and time
+                    # Pick the best candidate: version match first, then latest time
                     candidates = []
-                    for m in matches:
+                    for m, mtime in matches:
                         try:
-                            with open(m, 'r', encoding='utf-8') as f:
-                                intel = json.load(f)
-                                ver = intel.get("_contract", {}).get("version", intel.get("_cache_version", "0.0"))
-                                candidates.append({"ver": ver, "mtime": m.stat().st_mtime})
+                            intel = load_json(m)
+                            ver = intel.get("_contract", {}).get("version", intel.get("_cache_version", "0.0"))
+                            candidates.append({"ver": ver, "mtime": mtime})
                         except: continue
+                        # Only the version is read from the winner, so any authoritative match settles it
+                        if ver == REFERENCE_CACHE_VERSION:
+                            break
                     
                     if candidates:
-                        candidates.sort(key=lambda x: (x["ver"] == REFERENCE_CACHE_VERSION, x["mtime"]), reverse=True)
-                        best = candidates[0]
+                        best = max(candidates, key=lambda x: (x["ver"] == REFERENCE_CACHE_VERSION, x["mtime"]))
                         meta["version"] = best["ver"]
                         if best["ver"] == REFERENCE_CACHE_VERSION:
                             meta["intelligence_status"] = "authoritative"
@@ -353,6 +942,7 @@ class LibraryIndex:
                 if json_path.exists():
                     meta["intelligence_status"] = "authoritative"
                 
+            cls._meta_cache[str(p)] = (file_stat.st_size, file_stat.st_mtime_ns, cls._dependency_stamp(p, type_tag, h), meta, h)
             return meta, p, h
         except Exception as e:
             print(f"[INDEX] Global Error processing {p}: {e}")
@@ -362,99 +952,309 @@ class LibraryIndex:
 # ENDPOINTS
 # ============================================================================
 
+# Clip placement runs on worker threads, so free-name selection is serialized
+# and a chosen name stays reserved until its file has landed.
+_upload_name_lock = threading.Lock()
+_claimed_upload_paths: set[Path] = set()
+
+def claim_upload_path(path: Path) -> Path:
+    """Reserve path, or the first free base_1, base_2, ... variant of it."""
+    with _upload_name_lock:
+        base_name = path.stem
+        counter = 1
+        candidate = path
+        while candidate in _claimed_upload_paths or candidate.exists():
+            candidate = path.with_name(f"{base_name}_{counter}{path.suffix}")
+            counter += 1
+        _claimed_upload_paths.add(candidate)
+    return candidate
+
+def release_upload_path(path: Path):
+    with _upload_name_lock:
+        _claimed_upload_paths.discard(path)
+
+# Client-side dedup: uploads also record the clip's SHA-256 (what browsers can
+# compute via SubtleCrypto) as a "sha256:" alias in source_map, so clients can ask
+# which files are already here and send only the digests for those.
+def content_alias(digest: str) -> str:
+    return f"sha256:{digest.lower()}"
+
+def resolve_known_clip(digest: str) -> Optional[Path]:
+    cached = source_map.get(content_alias(digest))
+    if cached and Path(cached).exists():
+        return Path(cached)
+    return None
+
+def resolve_known_clip_results(digests: List[str]) -> List[dict]:
+    """
+    Upload results for clips sent by digest instead of bytes. Blocking
+    (stat + hash registry), so callers run it in a worker thread.
+    Raises 409 for a digest whose clip is no longer in the library.
+    """
+    results = []
+    for digest in digests:
+        known_path = resolve_known_clip(digest)
+        if known_path is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Clip {digest[:12]} is not in the library anymore. Upload the file instead."
+            )
+        known_size = known_path.stat().st_size
+        results.append({
+            "path": str(known_path),
+            "original_filename": known_path.name,
+            "original_size": known_size,
+            "final_size": known_size,
+            "was_skipped": True,
+            "clip_hash": get_file_hash(known_path)
+        })
+    return results
+
+# Byte-range serving: Starlette's FileResponse always sends the whole file, so
+# video seeks (Range: bytes=N-) are answered with a streamed 206 slice instead.
+RANGE_CHUNK_SIZE = 1 << 20
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single 'bytes=start-end' / 'bytes=-suffix' range into inclusive offsets.
+    Returns None for headers we don't serve partially (multi-range, other units).
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if start_s:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+        else:
+            start = max(0, size - int(end_s))
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+async def _open_for_zerocopy(path) -> BinaryIO:
+    """Open a file for zerocopysend off the event loop; missing files fail like FileResponse's stat."""
+    try:
+        return await anyio.to_thread.run_sync(open, path, "rb")
+    except FileNotFoundError:
+        raise RuntimeError(f"File at path {path} does not exist.")
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the open file to the server when it advertises the
+    ASGI zero-copy send extension, so the body goes out via sendfile() instead
+    of being read into Python in chunks. Other servers get the normal path.
+    """
+    async def __call__(self, scope, receive, send):
+        if "http.response.zerocopysend" not in scope.get("extensions", {}) or scope["method"].upper() == "HEAD":
+            await super().__call__(scope, receive, send)
+            return
+        if self.stat_result is None:
+            try:
+                self.set_stat_headers(await anyio.to_thread.run_sync(os.stat, self.path))
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+        with await _open_for_zerocopy(self.path) as f:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.zerocopysend", "file": f, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+async def _iter_file_range(path: Path, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+class FileRangeResponse(StreamingResponse):
+    """
+    206 Partial Content for one byte range. Zero-copy (sendfile with
+    offset/count) when the server supports it, streamed in chunks otherwise.
+    """
+    def __init__(self, path: Path, start: int, length: int, **kwargs):
+        super().__init__(_iter_file_range(path, start, length), status_code=206, **kwargs)
+        self.path, self.start, self.length = path, start, length
+
+    async def __call__(self, scope, receive, send):
+        if "http.response.zerocopysend" not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+        with await _open_for_zerocopy(self.path) as f:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.zerocopysend", "file": f, "offset": self.start, "count": self.length, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+def ranged_file_response(path: Path, stat_result: os.stat_result, range_header: Optional[str], media_type: str, filename: Optional[str] = None):
+    """FileResponse for whole-file requests, a streamed 206 Partial Content for single ranges."""
+    byte_range = parse_byte_range(range_header, stat_result.st_size) if range_header else None
+    if byte_range is None:
+        response = ZeroCopyFileResponse(path, media_type=media_type, filename=filename, stat_result=stat_result)
+        response.headers["Accept-Ranges"] = "bytes"
+        return response
+    start, end = byte_range
+    length = end - start + 1
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+        "Content-Length": str(length),
+    }
+    if filename:
+        # Same encoding FileResponse uses, so non-ASCII names survive
+        quoted = quote(filename)
+        if quoted != filename:
+            headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quoted}"
+        else:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return FileRangeResponse(path, start, length, media_type=media_type, headers=headers)
+
+def stat_served_file(path: Path) -> os.stat_result:
+    """Stat a file about to be served; 404 unless it exists and is a regular file."""
+    try:
+        stat_result = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    return stat_result
+
+async def spool_upload(upload: UploadFile, dest: Optional[Path], *hashers) -> int:
+    """
+    Stream an upload through hashers (and into dest, if given) in 1 MiB chunks
+    on a worker thread, so uploads are never buffered whole in memory.
+    """
+    await upload.seek(0)
+    return await asyncio.to_thread(functools.partial(copy_and_hash, upload.file, dest, *hashers, size_hint=upload.size))
+
 @app.post("/api/identify")
 async def identify_reference(reference: UploadFile = File(...)):
     """
     Fast identity scan of reference video to determine session_id.
     """
-    ext = Path(reference.filename).suffix.lower()
+    ext = file_ext(reference.filename)
     if ext not in video_exts:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported reference format '{ext}'. Allowed: {', '.join(sorted(video_exts))}"
+            detail=f"Unsupported reference format '{ext}'. Allowed: {VIDEO_EXTS_MSG}"
         )
     
-    content = await reference.read()
-    content_hash = hashlib.md5(content).hexdigest()[:12]
+    hasher = new_session_hasher()
+    await spool_upload(reference, None, hasher)
+    content_hash = content_hexdigest(hasher)[:12]
     return {"session_id": f"sess_{content_hash}"}
 
+@app.post("/api/check-hashes")
+async def check_hashes(hashes: List[str] = Body(..., embed=True)):
+    """
+    Report which clip SHA-256 digests the library already holds.
+    Known clips can be passed to /api/upload via X-Clip-Hash-SHA256 instead of re-sent.
+    """
+    return {"known": [h for h in hashes if resolve_known_clip(h)]}
+
 @app.post("/api/upload")
 async def upload_files(
     reference: Optional[UploadFile] = File(None),
-    clips: List[UploadFile] = File(...),
-    music: Optional[UploadFile] = File(None)
+    clips: List[UploadFile] = File(None),
+    music: Optional[UploadFile] = File(None),
+    x_clip_hash_sha256: Optional[str] = Header(None)
 ):
     """
     Upload reference video (optional), user clips, and music (optional).
     Saves directly to data/samples/ structure.
+    Clips already in the library may be listed by SHA-256 in the
+    X-Clip-Hash-SHA256 header (comma-separated) instead of being uploaded.
     """
+    clips = clips or []
     if reference:
-        ext = Path(reference.filename).suffix.lower()
+        ext = file_ext(reference.filename)
         if ext not in video_exts:
             raise HTTPException(
                 status_code=400,
-                detail=f"Reference format '{ext}' is not supported. Allowed: {', '.join(sorted(video_exts))}"
+                detail=f"Reference format '{ext}' is not supported. Allowed: {VIDEO_EXTS_MSG}"
             )
     
-    if music and not (music.filename.lower().endswith('.mp3') or music.filename.lower().endswith('.wav') or music.filename.lower().endswith('.mp4')):
+    if music and file_ext(music.filename) not in (".mp3", ".wav", ".mp4"):
         raise HTTPException(status_code=400, detail="Music must be .mp3, .wav, or .mp4 format")
     
     for clip in clips:
-        ext = Path(clip.filename).suffix.lower()
+        ext = file_ext(clip.filename)
         if ext not in video_exts:
             raise HTTPException(
                 status_code=400,
-                detail=f"Clip format '{ext}' is not supported for {clip.filename}. Allowed: {', '.join(sorted(video_exts))}"
+                detail=f"Clip format '{ext}' is not supported for {clip.filename}. Allowed: {VIDEO_EXTS_MSG}"
             )
     
+    # Resolve by-digest clips up front; verified on disk, never trusted blindly
+    # (stat + get_file_hash can read and re-save the hash registry, so off the loop)
+    digests = [d for d in (d.strip() for d in (x_clip_hash_sha256 or "").split(",")) if d]
+    known_clip_results = await asyncio.to_thread(resolve_known_clip_results, digests) if digests else []
+    
+    if not clips and not known_clip_results:
+        raise HTTPException(status_code=400, detail="At least one clip is required")
+    
+    temp_upload_dir = TEMP_DIR / "uploads"
+    temp_upload_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Stream the reference to a spool file, hashing in the same pass
+    if reference:
+        ref_hasher = new_session_hasher()
+        ref_sampler = SampledHasher()
+        ref_spool = temp_upload_dir / f"{uuid.uuid4().hex}_{Path(reference.filename).name}"
+        await spool_upload(reference, ref_spool, ref_hasher, ref_sampler)
+        ref_hash = content_hexdigest(ref_hasher)
+        ref_fingerprint = ref_sampler.hexdigest()
+    
+    # Save Music if provided (hashed while it is written)
+    music_path = None
+    if music:
+        music_dir = DATA_DIR / "samples" / "music"
+        music_dir.mkdir(parents=True, exist_ok=True)
+        music_path = music_dir / music.filename
+        music_hasher = new_session_hasher()
+        await spool_upload(music, music_path, music_hasher)
+    
     # Calculate session_id
     if reference:
-        ref_content = await reference.read()
-        ref_hash = hashlib.md5(ref_content).hexdigest()
         session_id = f"sess_{ref_hash}"
     elif music:
-        music_content = await music.read()
-        music_hash = hashlib.md5(music_content).hexdigest()
+        music_hash = content_hexdigest(music_hasher)
         session_id = f"text_music_{music_hash}"
     else:
         session_id = f"text_{uuid.uuid4().hex[:12]}"
     
     print(f"\n[UPLOAD] New upload request")
     print(f"[UPLOAD] Session ID: {session_id}")
-    
-    # Save Music if provided
-    music_path = None
-    if music:
-        music_dir = DATA_DIR / "samples" / "music"
-        music_dir.mkdir(parents=True, exist_ok=True)
-        music_path = music_dir / music.filename
-        
-        # Reset read pointer if we read it for hash
-        if not reference: await music.seek(0)
-        content = await music.read()
-        
-        with open(music_path, "wb") as f:
-            f.write(content)
+    if music_path:
         print(f"[UPLOAD] Music saved to: {music_path}")
 
     ref_path = None
     if reference:
-        # Check if file with same content already exists
-        existing_ref = None
-        for existing_file in REFERENCES_DIR.glob("*.mp4"):
-            if existing_file.is_file():
-                try:
-                    with open(existing_file, 'rb') as f:
-                        existing_hash = hashlib.md5(f.read()).hexdigest()
-                    if existing_hash == ref_hash:
-                        existing_ref = existing_file
-                        print(f"[UPLOAD] Reference content already exists: {existing_file.name} (reusing)")
-                        break
-                except Exception:
-                    continue
+        # Check if file with same content already exists - same fingerprint
+        # lookup as clips, against the references LibraryIndex already hashed.
+        # The fingerprint only samples head/tail/size, so a hit is confirmed
+        # against the full hash before the upload is discarded.
+        existing_ref = (await LibraryIndex.get_reference_hashes()).get(ref_fingerprint)
+        if existing_ref:
+            try:
+                existing_hash = await run_in_index_executor(LibraryIndex.reference_content_hash, existing_ref)
+            except OSError:
+                existing_hash = None
+            if existing_hash == ref_hash:
+                print(f"[UPLOAD] Reference content already exists: {existing_ref.name} (reusing)")
+            else:
+                existing_ref = None
         
         if existing_ref:
             ref_path = existing_ref
+            ref_spool.unlink()
         else:
             # Save new reference
             ref_path = REFERENCES_DIR / reference.filename
@@ -466,8 +1266,9 @@ async def upload_files(
                     counter += 1
                 print(f"[UPLOAD] Reference filename conflict, saved as: {ref_path.name}")
             
-            with open(ref_path, "wb") as f:
-                f.write(ref_content)
+            os.replace(ref_spool, ref_path)
+            register_file_hash(ref_path, ref_fingerprint)
+            LibraryIndex.update_reference_sync(ref_fingerprint, ref_path, ref_hash)
             print(f"[UPLOAD] Reference saved to: {ref_path}")
     
     # Save clips to data/samples/clips/
@@ -479,14 +1280,27 @@ async def upload_files(
     
     print(f"[UPLOAD] Protocol initialized - Cross-referencing {len(existing_hashes)} library assets...")
     
-    temp_upload_dir = TEMP_DIR / "uploads"
-    temp_upload_dir.mkdir(parents=True, exist_ok=True)
+    def _place_clip(clip, clip_ext: str, spool_path: Path, hasher: SampledHasher, file_size: int, content_sha256: str):
+        result = _place_clip_bytes(clip, clip_ext, spool_path, hasher, file_size, content_sha256)
+        source_map[content_alias(content_sha256)] = result["path"]
+        return result
 
-    async def process_clip(clip):
-        clip_content = await clip.read()
-        file_size = len(clip_content)
-        clip_ext = Path(clip.filename).suffix.lower()
-        clip_hash = get_bytes_hash(clip_content) if clip_ext == ".mp4" else ""
+    def _place_clip_bytes(clip, clip_ext: str, spool_path: Path, hasher: SampledHasher, file_size: int, content_sha256: str):
+        clip_hash = hasher.hexdigest() if clip_ext == ".mp4" else ""
+        
+        # 0. Exact-bytes alias: also catches re-uploads of non-MP4 sources,
+        # which would otherwise be converted all over again
+        known_path = resolve_known_clip(content_sha256)
+        if known_path is not None:
+            known_size = known_path.stat().st_size
+            return {
+                "path": str(known_path),
+                "original_filename": clip.filename,
+                "original_size": file_size,
+                "final_size": known_size,
+                "was_skipped": True,
+                "clip_hash": get_file_hash(known_path)
+            }
         
         # 1. Direct Content Check (Source-to-Source)
         # If we've seen THESE EXACT BYTES before, return the previous path immediately
@@ -497,6 +1311,7 @@ async def upload_files(
                     "path": str(cached_path),
                     "original_filename": clip.filename,
                     "original_size": file_size,
+                    "final_size": file_size,
                     "was_skipped": True,
                     "clip_hash": clip_hash
                 }
@@ -510,6 +1325,7 @@ async def upload_files(
                 "path": str(existing_clip),
                 "original_filename": clip.filename,
                 "original_size": file_size,
+                "final_size": file_size,
                 "was_skipped": True,
                 "clip_hash": clip_hash
             }
@@ -520,35 +1336,31 @@ async def upload_files(
         
         # v11.8: Use the hash in the filename for collision-free uniqueness if requested,
         # otherwise use the iterating name but guard the source_map carefully.
-        if clip_path.exists():
-            base_name = clip_path.stem
-            counter = 1
-            while clip_path.exists():
-                clip_path = CLIPS_DIR / f"{base_name}_{counter}{clip_path.suffix}"
-                counter += 1
-
-        if clip_ext != ".mp4":
-            raw_path = temp_upload_dir / clip.filename
-            with open(raw_path, "wb") as f:
-                f.write(clip_content)
-            try:
-                convert_to_mp4(str(raw_path), str(clip_path))
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Conversion failed for {clip.filename}. {e}"
-                )
-            finally:
-                if raw_path.exists():
-                    raw_path.unlink()
-        else:
-            with open(clip_path, "wb") as f:
-                f.write(clip_content)
+        clip_path = claim_upload_path(clip_path)
+        try:
+            if clip_ext != ".mp4":
+                try:
+                    convert_to_mp4(str(spool_path), str(clip_path))
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Conversion failed for {clip.filename}. {e}"
+                    )
+            else:
+                os.replace(spool_path, clip_path)
+        finally:
+            release_upload_path(clip_path)
 
-        clip_hash = get_file_hash(clip_path)
-        if not clip_hash:
-            clip_hash = get_bytes_hash(clip_content)
+        if clip_ext == ".mp4":
+            # Same bytes as the spool, so the streamed fingerprint is the file's hash
             register_file_hash(clip_path, clip_hash)
+            final_size = file_size
+        else:
+            clip_hash = get_file_hash(clip_path)
+            if not clip_hash:
+                clip_hash = hasher.hexdigest()
+                register_file_hash(clip_path, clip_hash)
+            final_size = clip_path.stat().st_size
 
         # 3. Update the mapping for future fast-tracking
         source_map[clip_hash] = str(clip_path)
@@ -557,12 +1369,35 @@ async def upload_files(
             "path": str(clip_path),
             "original_filename": clip.filename,
             "original_size": file_size,
+            "final_size": final_size,
             "was_skipped": False,
             "clip_hash": clip_hash
         }
 
-    # Process clips in parallel using asyncio.gather
-    clip_results = await asyncio.gather(*[process_clip(clip) for clip in clips])
+    async def process_clip(clip):
+        # Hash + write in one streamed pass; the spool file is either discarded
+        # (duplicate), renamed into the library, or used as conversion input.
+        clip_ext = file_ext(clip.filename)
+        spool_path = temp_upload_dir / f"{uuid.uuid4().hex}_{Path(clip.filename).name}"
+        hasher = SampledHasher()
+        sha256 = hashlib.sha256()
+        try:
+            file_size = await spool_upload(clip, spool_path, hasher, sha256)
+            # Rename/conversion run on a worker thread so the loop keeps serving
+            return await asyncio.to_thread(_place_clip, clip, clip_ext, spool_path, hasher, file_size, sha256.hexdigest())
+        finally:
+            if spool_path.exists():
+                spool_path.unlink()
+
+    # Process clips in parallel, at most UPLOAD_CONCURRENCY in flight so large
+    # batches keep a bounded disk queue depth
+    upload_sem = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def bounded_process_clip(clip):
+        async with upload_sem:
+            return await process_clip(clip)
+
+    clip_results = known_clip_results + list(await asyncio.gather(*[bounded_process_clip(clip) for clip in clips]))
     
     clip_paths = []
     for res in clip_results:
@@ -572,10 +1407,10 @@ async def upload_files(
         else:
             print(f"[UPLOAD] New clip saved: {Path(res['path']).name}")
     
-    print(f"[UPLOAD] {len(clips)} clips processed, {len(clip_paths)} clips will be used ({len(clip_paths) - skipped_count} new, {skipped_count} existing reused)")
+    print(f"[UPLOAD] {len(clip_results)} clips processed, {len(clip_paths)} clips will be used ({len(clip_paths) - skipped_count} new, {skipped_count} existing reused)")
     
     # Persist the source map to disk
-    save_source_map()
+    schedule_save("source_map")
     
     # Store session info
     active_sessions[session_id] = {
@@ -588,7 +1423,8 @@ async def upload_files(
         "iteration": 0,
         "created_at": time.time()
     }
-    save_active_sessions()
+    append_session_event("put", session_id, active_sessions[session_id])
+    session_table.upsert(session_id, active_sessions[session_id])
     
     print(f"[UPLOAD] Protocol initialized - session {session_id[:8]} active\n")
     
@@ -601,8 +1437,7 @@ async def upload_files(
         ref_thumb_name = f"thumb_{ref_hash}.jpg"
         ref_thumb_path = THUMBNAILS_DIR / ref_thumb_name
         try:
-            if not ref_thumb_path.exists():
-                generate_thumbnail(str(ref_path), str(ref_thumb_path))
+            await ensure_thumbnail(str(ref_path), str(ref_thumb_path))
             reference_payload["thumbnail_url"] = f"/api/files/thumbnails/{ref_thumb_name}"
             
             # Signature for frontend matching
@@ -611,31 +1446,34 @@ async def upload_files(
         except Exception as e:
             print(f"[THUMB] Ref thumbnail failed: {e}")
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        def get_payload_with_meta(res):
-            clip_path = Path(res["path"])
-            clip_hash = get_file_hash(clip_path)
-            # v12.1 Unified Thumbnail
-            thumb_name = f"thumb_{clip_hash}.jpg"
-            thumb_path = THUMBNAILS_DIR / thumb_name
-            try:
-                if not thumb_path.exists():
-                    generate_thumbnail(str(clip_path), str(thumb_path))
-                thumb_url = f"/api/files/thumbnails/{thumb_name}"
-            except Exception as e:
-                print(f"[THUMB] Clip thumbnail failed: {e}")
-                thumb_url = None
+    # Clip thumbnails extract as concurrent ffmpeg subprocesses (process-wide limit).
+    # Dedup hits already own their content-addressed thumbnail and skip ffmpeg.
+    async def get_payload_with_meta(res):
+        clip_path = Path(res["path"])
+        # Hash and size were settled by process_clip - no re-hash or stat here
+        clip_hash = res["clip_hash"]
+        # v12.1 Unified Thumbnail
+        thumb_name = f"thumb_{clip_hash}.jpg"
+        thumb_path = THUMBNAILS_DIR / thumb_name
+        try:
+            if not thumb_path.exists():
+                async with _upload_thumb_sem:
+                    await ensure_thumbnail(str(clip_path), str(thumb_path))
+            thumb_url = f"/api/files/thumbnails/{thumb_name}"
+        except Exception as e:
+            print(f"[THUMB] Clip thumbnail failed: {e}")
+            thumb_url = None
 
-            return {
-                "filename": clip_path.name,
-                "size": clip_path.stat().st_size,
-                "original_filename": res["original_filename"],
-                "original_size": res["original_size"],
-                "thumbnail_url": thumb_url,
-                "clip_hash": res.get("clip_hash") or clip_hash
-            }
-            
-        clips_payload = list(executor.map(get_payload_with_meta, clip_results))
+        return {
+            "filename": clip_path.name,
+            "size": res["final_size"],
+            "original_filename": res["original_filename"],
+            "original_size": res["original_size"],
+            "thumbnail_url": thumb_url,
+            "clip_hash": clip_hash
+        }
+
+    clips_payload = await asyncio.gather(*[get_payload_with_meta(res) for res in clip_results])
 
     return {
         "session_id": session_id,
@@ -671,29 +1509,29 @@ async def generate_video(
         if session["status"] == "processing":
             return {"status": "already_processing", "session_id": session_id}
         
-        # Prepare for iteration - detect next number from disk to stay persistent
-        tag = session_id if len(session_id) < 12 else session_id[:12]
-        existing_versions = []
+        # Prepare for iteration - the LibraryIndex tracks the latest version on disk
+        tag = session_tag(session_id)
+        disk_max = await LibraryIndex.peek_iteration(tag)
         
-        # Scan RESULTS_DIR for existing versions of this session
-        if RESULTS_DIR.exists():
-            for f in RESULTS_DIR.glob(f"*_{tag}_v*.mp4"):
-                try:
-                    # Extract N from ..._vN
-                    v_part = f.stem.split("_v")[-1]
-                    if v_part.isdigit():
-                        existing_versions.append(int(v_part))
-                except: pass
+        # Index not built yet: scan RESULTS_DIR for existing versions of this session
+        if disk_max is None:
+            disk_max = 0
+            if RESULTS_DIR.exists():
+                for f in RESULTS_DIR.glob(f"*_{tag}_v*.mp4"):
+                    version = parse_result_iteration(f.stem)
+                    if version and version[0] == tag:
+                        disk_max = max(disk_max, version[1])
                 
         # Default to memory count if not found on disk, but prioritize disk
-        disk_max = max(existing_versions) if existing_versions else 0
         current_iteration = max(disk_max + 1, session.get("iteration", 0) + 1)
         
         session["iteration"] = current_iteration
         
         # Mark as processing
-        session["status"] = "processing"
+        set_session_status(session_id, "processing")
         session["progress"] = 0.0
+        log_session_fields(session_id, "status", "iteration", "progress")
+        notify_progress(session_id)
     
     # Run pipeline in background
     print(f"[GENERATE] Executing iteration v{current_iteration} for session: {session_id}")
@@ -736,7 +1574,9 @@ def process_video_pipeline(
     
     # Initialize logs list in session
     if session_id in active_sessions:
-        active_sessions[session_id]["logs"] = []
+        with _ws_log_lock:
+            active_sessions[session_id]["logs"] = []
+            active_sessions[session_id]["log_count"] = 0
     
     # Custom stdout handler to capture orchestrator output
     class LogCapture:
@@ -747,47 +1587,9 @@ def process_video_pipeline(
 
         def _should_store_line(self, line: str) -> bool:
             """Filter noisy debug output for WS/UI logs without affecting stdout or file logs."""
-            s = (line or "").strip()
-            if not s:
-                return False
-
-            # Always keep warnings/errors/progress and top-level pipeline markers.
-            keep_prefixes = (
-                "[PROGRESS]",
-                "[PIPELINE]",
-                "[GENERATE]",
-                "[WARN]",
-                "[ERROR]",
-                "[OK]",
-                "✅",
-                "❌",
-            )
-            if s.startswith(keep_prefixes):
-                return True
-
-            # Drop high-volume debug noise (X-RAY, cache spam, deep analysis dumps)
-            drop_prefixes = (
-                "[CACHE]",
-                "[NEW]",
-                "[THUMB]",
-                "[INDEX]",
-                "🔬",
-            )
-            if s.startswith(drop_prefixes):
-                return False
-
-            drop_contains = (
-                "X-RAY",
-                "TOP 5 CANDIDATES",
-                "SEGMENT SCORING",
-                "CLIP USAGE ANALYSIS",
-                "BLUEPRINT SEGMENTS",
-                "END OF X-RAY REPORT",
-            )
-            if any(token in s for token in drop_contains):
-                return False
-
-            return False
+            # Allow-list: everything else (X-RAY dumps, cache spam, ...) is dropped.
+            # str.startswith over a tuple is a single C-level pass per line.
+            return line.startswith(WS_LOG_KEEP_PREFIXES)
         
         def write(self, s):
             # Write to original stdout (console)
@@ -795,16 +1597,19 @@ def process_video_pipeline(
             self.original_stdout.flush()
             
             # Store in session logs
-            if self.session_id in active_sessions:
-                if s.strip():  # Only store non-empty lines
-                    # Split by newlines and add each line
-                    lines = s.split('\n')
-                    for line in lines:
-                        if self._should_store_line(line):
-                            active_sessions[self.session_id]["logs"].append(line.strip())
-                            # Keep only last 500 lines to avoid memory issues
-                            if len(active_sessions[self.session_id]["logs"]) > 500:
-                                active_sessions[self.session_id]["logs"].pop(0)
+            session = active_sessions.get(self.session_id)
+            if session is not None and s.strip():  # Only store non-empty lines
+                # Split by newlines and add each line
+                kept = [line for line in (raw.strip() for raw in s.split('\n')) if line and self._should_store_line(line)]
+                if kept:
+                    with _ws_log_lock:
+                        logs = session["logs"]
+                        logs.extend(kept)
+                        session["log_count"] = session.get("log_count", 0) + len(kept)
+                        # Keep only last 500 lines to avoid memory issues
+                        if len(logs) > 500:
+                            del logs[:-500]
+                    notify_progress(self.session_id)
         
         def flush(self):
             self.original_stdout.flush()
@@ -828,6 +1633,7 @@ def process_video_pipeline(
             active_sessions[session_id]["progress"] = step / total
             active_sessions[session_id]["current_step"] = message
             print(f"[PROGRESS] Step {step}/{total}: {message}")
+            notify_progress(session_id)
     
     try:
         if session_id not in active_sessions:
@@ -859,25 +1665,27 @@ def process_video_pipeline(
             
             # Generate thumbnail for the result immediately for Vault UI
             res_path = Path(result.output_path)
+            LibraryIndex.note_iteration(session_tag(session_id), iteration)
             res_hash = get_file_hash(res_path)
             # v12.1 Unified Thumbnail: Content-addressed only
             res_thumb_name = f"thumb_{res_hash}.jpg"
             res_thumb_path = THUMBNAILS_DIR / res_thumb_name
             res_thumb_url = None
             try:
-                if not res_thumb_path.exists():
-                    generate_thumbnail(str(res_path), str(res_thumb_path))
+                generate_thumbnail_once(str(res_path), str(res_thumb_path))
                 res_thumb_url = f"/api/files/thumbnails/{res_thumb_name}"
             except Exception as te:
                 print(f"[THUMB] Result thumbnail failed: {te}")
 
-            active_sessions[session_id]["status"] = "complete"
+            set_session_status(session_id, "complete")
             active_sessions[session_id]["output_path"] = result.output_path
             active_sessions[session_id]["thumbnail_url"] = res_thumb_url
             active_sessions[session_id]["blueprint"] = result.blueprint.model_dump() if result.blueprint else None
             active_sessions[session_id]["clip_index"] = result.clip_index.model_dump() if result.clip_index else None
             
-            save_active_sessions()
+            log_session_fields(session_id, "status", "iteration", "progress", "output_path",
+                               "thumbnail_url", "blueprint", "clip_index")
+            notify_progress(session_id)
             
             # Trigger index refresh safely in background thread
             try:
@@ -886,16 +1694,20 @@ def process_video_pipeline(
                 print(f"[WARN] Post-render index refresh skipped: {e}")
         else:
             print(f"\n[PIPELINE] FAILED - Error: {result.error}")
-            active_sessions[session_id]["status"] = "error"
+            set_session_status(session_id, "error")
             active_sessions[session_id]["error"] = result.error
+            log_session_fields(session_id, "status", "iteration", "progress", "error")
+            notify_progress(session_id)
             
     except Exception as e:
         elapsed = time.time() - start_time
         print(f"\n[PIPELINE] EXCEPTION after {elapsed:.1f}s: {e}")
         import traceback
         traceback.print_exc()
-        active_sessions[session_id]["status"] = "error"
+        set_session_status(session_id, "error")
         active_sessions[session_id]["error"] = str(e)
+        log_session_fields(session_id, "status", "iteration", "progress", "error")
+        notify_progress(session_id)
     finally:
         # Restore stdout
         sys.stdout = original_stdout
@@ -921,7 +1733,7 @@ async def get_status(session_id: str):
 
 
 @app.get("/api/download/{session_id}")
-async def download_video(session_id: str):
+async def download_video(session_id: str, request: Request):
     """
     Download final video.
     """
@@ -933,18 +1745,28 @@ async def download_video(session_id: str):
     if session["status"] != "complete":
         raise HTTPException(status_code=400, detail="Video not ready")
     
-    output_path = session["output_path"]
+    output_path = Path(session["output_path"])
     
-    if not Path(output_path).exists():
+    # One stat: existence check and Content-Length come from the same result
+    try:
+        stat_result = output_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Output file not found")
     
-    return FileResponse(
+    return ranged_file_response(
         output_path,
+        stat_result,
+        request.headers.get("range"),
         media_type="video/mp4",
         filename=f"mimic_output_{session_id}.mp4"
     )
 
 
+async def send_ws_json(websocket: WebSocket, data: dict):
+    """send_json() equivalent that serializes with orjson when available (still a text frame)."""
+    await websocket.send_text(dump_json_bytes(data).decode("utf-8"))
+
+
 @app.websocket("/ws/progress/{session_id}")
 async def websocket_progress(websocket: WebSocket, session_id: str):
     """
@@ -987,7 +1809,7 @@ async def websocket_progress(websocket: WebSocket, session_id: str):
         
         if session_id not in active_sessions:
             print(f"[WS] Session not found after {max_wait}s: {session_id}")
-            await websocket.send_json({
+            await send_ws_json(websocket, {
                 "status": "error",
                 "progress": 0.0,
                 "message": "Session not found. Make sure you've uploaded files first."
@@ -997,43 +1819,64 @@ async def websocket_progress(websocket: WebSocket, session_id: str):
         
         # Send initial status
         session = active_sessions[session_id]
-        await websocket.send_json({
+        await send_ws_json(websocket, {
             "status": session["status"],
             "progress": session.get("progress", 0.0),
             "message": session.get("current_step", "Waiting to start...")
         })
         
-        while True:
-            if session_id in active_sessions:
-                session = active_sessions[session_id]
-                await websocket.send_json({
-                    "status": session["status"],
-                    "progress": session.get("progress", 0.0),
-                    "message": session.get("current_step", ""),
-                    "logs": session.get("logs", [])
-                })
-                
-                # Stop sending if complete or error
-                if session["status"] in ["complete", "error"]:
-                    print(f"[WS] Session {session_id} finished with status: {session['status']}")
+        # Push on change: the pipeline wakes this socket, and each message only
+        # carries log lines the client hasn't seen ("log_offset" = absolute index
+        # of the first line in "logs", so clients append rather than replace).
+        wakeup = asyncio.Event()
+        watcher = (asyncio.get_running_loop(), wakeup)
+        _progress_watchers.setdefault(session_id, set()).add(watcher)
+        logs_sent = 0
+        try:
+            while True:
+                wakeup.clear()
+                if session_id in active_sessions:
+                    session = active_sessions[session_id]
+                    new_logs, log_offset, logs_sent = read_new_logs(session, logs_sent)
+                    await send_ws_json(websocket, {
+                        "status": session["status"],
+                        "progress": session.get("progress", 0.0),
+                        "message": session.get("current_step", ""),
+                        "logs": new_logs,
+                        "log_offset": log_offset
+                    })
+                    
+                    # Stop sending if complete or error
+                    if session["status"] in ["complete", "error"]:
+                        print(f"[WS] Session {session_id} finished with status: {session['status']}")
+                        break
+                else:
+                    # Session was deleted
+                    await send_ws_json(websocket, {
+                        "status": "error",
+                        "progress": 0.0,
+                        "message": "Session expired"
+                    })
                     break
-            else:
-                # Session was deleted
-                await websocket.send_json({
-                    "status": "error",
-                    "progress": 0.0,
-                    "message": "Session expired"
-                })
-                break
-            
-            await asyncio.sleep(1)  # Update every second
+                
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=WS_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass # Heartbeat
+                await asyncio.sleep(WS_PUSH_INTERVAL) # Coalesce bursts of log lines
+        finally:
+            watchers = _progress_watchers.get(session_id)
+            if watchers is not None:
+                watchers.discard(watcher)
+                if not watchers:
+                    _progress_watchers.pop(session_id, None)
             
     except Exception as e:
         print(f"[WS] Error in WebSocket handler: {e}")
         import traceback
         traceback.print_exc()
         try:
-            await websocket.send_json({
+            await send_ws_json(websocket, {
                 "status": "error",
                 "progress": 0.0,
                 "message": f"Error: {str(e)}"
@@ -1057,12 +1900,12 @@ async def get_history():
     history = [
         {
             "session_id": sid,
-            "status": session["status"],
-            "created_at": session.get("created_at", ""),
-            "reference_filename": Path(session["reference_path"]).name,
-            "clip_count": len(session["clip_paths"])
+            "status": status,
+            "created_at": created_at,
+            "reference_filename": ref_name,
+            "clip_count": clip_count
         }
-        for sid, session in active_sessions.items()
+        for sid, status, created_at, ref_name, clip_count in session_table.rows()
     ]
     return {"projects": history}
 
@@ -1075,6 +1918,9 @@ async def delete_session(session_id: str):
     if session_id in active_sessions:
         cleanup_session(session_id)
         del active_sessions[session_id]
+        session_table.remove(session_id)
+        append_session_event("delete", session_id)
+        notify_progress(session_id)
         return {"status": "deleted"}
     
     raise HTTPException(status_code=404, detail="Session not found")
@@ -1161,6 +2007,7 @@ async def rename_file(type: str, old_filename: str, new_filename: str):
         
     # Rename video
     src.rename(dst)
+    LibraryIndex.rename_sync(src, dst)
     
     # Rename associated JSON if it exists (for results)
     if type == "results":
@@ -1174,6 +2021,35 @@ async def rename_file(type: str, old_filename: str, new_filename: str):
 # Hash Registry removed - moved to utils.py for global speed
 
 
+# Serialized intelligence responses: path -> (mtime_ns, size, JSON bytes). Warm
+# requests skip both the disk read and the parse; any rewrite changes the key.
+INTEL_CACHE_SIZE = 64
+_intel_cache: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+_intel_cache_lock = threading.Lock()
+
+def intel_json_response(path: Path, annotate=None) -> Response:
+    """
+    Serve an intelligence JSON file through the (mtime_ns, size) keyed cache.
+    annotate(data) runs on a miss, before serialization, to add response-only fields.
+    """
+    st = path.stat()
+    key = str(path)
+    with _intel_cache_lock:
+        cached = _intel_cache.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _intel_cache.move_to_end(key)
+            return Response(cached[2], media_type="application/json")
+    data = load_json(path)
+    if annotate is not None:
+        annotate(data)
+    body = dump_json_bytes(data)
+    with _intel_cache_lock:
+        _intel_cache[key] = (st.st_mtime_ns, st.st_size, body)
+        _intel_cache.move_to_end(key)
+        while len(_intel_cache) > INTEL_CACHE_SIZE:
+            _intel_cache.popitem(last=False)
+    return Response(body, media_type="application/json")
+
 @app.get("/api/intelligence")
 async def get_intelligence(type: str, filename: str):
     """
@@ -1184,6 +2060,11 @@ async def get_intelligence(type: str, filename: str):
     - references: Look for ref_{hash}_h*.json in data/cache/references/
     - clips: Look for clip_comprehensive_{hash}.json in data/cache/clips/
     """
+    # Stats, hashing and JSON parsing all block - keep them off the event loop
+    return await asyncio.to_thread(read_intelligence, type, filename)
+
+def read_intelligence(type: str, filename: str):
+    """Blocking body of get_intelligence(); runs on a worker thread."""
     try:
         if type == "results":
             # Strip extension and search for master JSON
@@ -1200,73 +2081,73 @@ async def get_intelligence(type: str, filename: str):
                     json_path = matches[0]
             
             if json_path.exists():
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return intel_json_response(json_path)
                     
         elif type == "references":
             ref_path = REFERENCES_DIR / filename
-            if not ref_path.exists():
+            try:
+                ref_stat = ref_path.stat()
+            except FileNotFoundError:
                 raise HTTPException(status_code=404, detail="Reference video not found")
             
-            ref_hash = get_file_hash(ref_path)
+            # Warm requests are a single stat(): the hash is memoized on (path, mtime_ns, size)
+            ref_hash = get_file_hash(ref_path, ref_stat)
             # Reference cache naming: ref_{hash}_v{ver}_h{fingerprint}.json
             # v12.1 Resolve Ambiguity: Find ALL matches, prioritize correct version, then latest time.
-            from engine.brain import REFERENCE_CACHE_VERSION
-            matches = list(REF_CACHE_DIR.glob(f"ref_{ref_hash}_*.json"))
+            matches = LibraryIndex.get_ref_cache_entries(ref_hash)
             if not matches:
                  return {"status": "pending", "message": "Reference analysis missing"}
             
-            # Create candidates list with metadata for sorting
+            # Create candidates list with metadata for sorting (version peeked, not parsed)
             candidates = []
-            for m in matches:
+            for m, mtime in matches:
                 try:
-                    with open(m, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        ver = data.get("_cache_version", data.get("cache_version", "0.0"))
-                        candidates.append({
-                            "path": m,
-                            "version": ver,
-                            "mtime": m.stat().st_mtime,
-                            "data": data
-                        })
+                    candidates.append({
+                        "path": m,
+                        "version": peek_cache_version(m),
+                        "mtime": mtime
+                    })
                 except: continue
-            
-            if not candidates:
-                 return {"status": "pending", "message": "Reference analysis unreadable"}
 
             # SORT: 1. Current Version Matches first, 2. Latest time first
             candidates.sort(key=lambda x: (x["version"] == REFERENCE_CACHE_VERSION, x["mtime"]), reverse=True)
             
-            target = candidates[0]
-            data = target["data"]
-            
-            # Inject authority indicators for frontend peace of mind
-            data["_status"] = "complete"
-            data["_authority"] = "authoritative" if target["version"] == REFERENCE_CACHE_VERSION else "legacy"
-            data["_engine_version"] = target["version"]
-            
-            if target["version"] != REFERENCE_CACHE_VERSION:
-                print(f"[INTEL] WARN: Serving legacy intelligence ({target['version']}) for {filename}")
+            # Only the winner is parsed in full (the next one if it turns out corrupt)
+            for target in candidates:
+                def annotate(data, version=target["version"]):
+                    # Inject authority indicators for frontend peace of mind
+                    data["_status"] = "complete"
+                    data["_authority"] = "authoritative" if version == REFERENCE_CACHE_VERSION else "legacy"
+                    data["_engine_version"] = version
+                
+                try:
+                    response = intel_json_response(target["path"], annotate)
+                except: continue
+                
+                if target["version"] != REFERENCE_CACHE_VERSION:
+                    print(f"[INTEL] WARN: Serving legacy intelligence ({target['version']}) for {filename}")
+                return response
             
-            return data
+            return {"status": "pending", "message": "Reference analysis unreadable"}
 
         elif type == "clips":
             clip_path = CLIPS_DIR / filename
-            if not clip_path.exists():
+            try:
+                clip_stat = clip_path.stat()
+            except FileNotFoundError:
                 raise HTTPException(status_code=404, detail="Clip video not found")
             
-            clip_hash = get_file_hash(clip_path)
+            clip_hash = get_file_hash(clip_path, clip_stat)
             # Clip cache naming: clip_comprehensive_{hash}.json
             json_path = CLIP_CACHE_DIR / f"clip_comprehensive_{clip_hash}.json"
             if json_path.exists():
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                def annotate(data):
                     # Verify Version Contract
-                    from engine.brain import CLIP_CACHE_VERSION
                     ver = data.get("_cache_version", data.get("cache_version", "0.0"))
                     if ver != CLIP_CACHE_VERSION:
                          print(f"[INTEL] WARN: Serving legacy intelligence ({ver}) for clip {filename}")
-                    return data
+                
+                return intel_json_response(json_path, annotate)
                     
         # If we reached here, the intelligence is not yet on disk
         return {
@@ -1289,60 +2170,67 @@ async def get_intelligence(type: str, filename: str):
 # ============================================================================
 
 @app.get("/api/files/results/{filename}")
-async def serve_result_file(filename: str):
+async def serve_result_file(filename: str, request: Request):
     """
     Serve a result video file explicitly.
     """
     result_path = RESULTS_DIR / filename
-    if not result_path.exists() or not result_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
-        path=str(result_path),
-        media_type=mimetypes.guess_type(str(result_path))[0] or "application/octet-stream",
+    # Range support: seeking in a <video> fetches only the bytes it needs
+    return ranged_file_response(
+        result_path,
+        stat_served_file(result_path),
+        request.headers.get("range"),
+        media_type=media_type_for_ext(file_ext(filename)),
         filename=filename
     )
 
 @app.get("/api/files/references/{filename}")
-async def serve_reference_file(filename: str):
+async def serve_reference_file(filename: str, request: Request):
     """
     Serve a reference video file explicitly.
     """
     ref_path = DATA_DIR / "samples" / "reference" / filename
-    if not ref_path.exists() or not ref_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
-        path=str(ref_path),
-        media_type=mimetypes.guess_type(str(ref_path))[0] or "application/octet-stream",
+    # Range support: seeking in a <video> fetches only the bytes it needs
+    return ranged_file_response(
+        ref_path,
+        stat_served_file(ref_path),
+        request.headers.get("range"),
+        media_type=media_type_for_ext(file_ext(filename)),
         filename=filename
     )
 
 @app.get("/api/files/samples/clips/{filename}")
-async def serve_sample_clip_file(filename: str):
+async def serve_sample_clip_file(filename: str, request: Request):
     """
     Serve a sample clip video file explicitly.
     """
     clip_path = DATA_DIR / "samples" / "clips" / filename
-    if not clip_path.exists() or not clip_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
-        path=str(clip_path),
-        media_type=mimetypes.guess_type(str(clip_path))[0] or "application/octet-stream",
+    # Range support: seeking in a <video> fetches only the bytes it needs
+    return ranged_file_response(
+        clip_path,
+        stat_served_file(clip_path),
+        request.headers.get("range"),
+        media_type=media_type_for_ext(file_ext(filename)),
         filename=filename
     )
 
-@app.get("/api/files/thumbnails/{filename}")
-async def serve_thumbnail_file(filename: str):
+class ImmutableStaticFiles(StaticFiles):
     """
-    Serve a thumbnail image file explicitly.
+    StaticFiles for content-addressed assets (thumb_{hash}.jpg).
+    The name changes whenever the content does, so browsers may cache forever.
     """
-    thumb_path = THUMBNAILS_DIR / filename
-    if not thumb_path.exists() or not thumb_path.is_file():
-        raise HTTPException(status_code=404, detail="Thumbnail not found")
-    return FileResponse(
-        path=str(thumb_path),
-        media_type="image/jpeg",
-        filename=filename
-    )
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# Thumbnails are requested in bulk by every gallery render: serve them through
+# StaticFiles (sendfile-capable FileResponse + ETag/304 handling) with long-lived caching.
+app.mount(
+    "/api/files/thumbnails",
+    ImmutableStaticFiles(directory=str(THUMBNAILS_DIR), html=False, check_dir=False),
+    name="thumbnails"
+)
 
 
 # Health check
@@ -1350,22 +2238,50 @@ async def serve_thumbnail_file(filename: str):
 async def health():
     return {"status": "healthy"}
 
-@app.post("/api/results/{filename}/style")
+def _inline_schema_refs(schema: dict) -> dict:
+    """Resolve a pydantic JSON schema's local $defs references in place (for openapi_extra)."""
+    defs = schema.pop("$defs", {})
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+    return resolve(schema)
+
+# The body is validated by hand (below), so document it explicitly
+STYLE_CONFIG_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": _inline_schema_refs(StyleConfig.model_json_schema())}}
+    }
+}
+
+@app.post("/api/results/{filename}/style", openapi_extra=STYLE_CONFIG_BODY_DOC)
 async def apply_style(
     filename: str,
-    style_config: StyleConfig = Body(...)
+    request: Request
 ):
     """
     v14.9: Apply visual styling (color, text, texture) to an existing result video.
     Uses clean master approach - always applies styling to unstyled version.
     """
-    from engine.stylist import apply_visual_styling
+    # Validate the raw body in one pydantic-core pass (JSON parse included),
+    # instead of stdlib json.loads into a dict followed by model validation
+    try:
+        style_config = StyleConfig.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
     
     print(f"[STYLE] Request received for {filename}")
     print(f"[STYLE] Preset: {style_config.color.preset}, Font: {style_config.text.font}")
     
     result_path = RESULTS_DIR / filename
-    if not result_path.exists():
+    try:
+        result_path.stat()
+    except FileNotFoundError:
         print(f"[STYLE] ERROR: File not found: {result_path}")
         raise HTTPException(status_code=404, detail="Result video not found")
     
@@ -1379,29 +2295,31 @@ async def apply_style(
         # First style application - current video becomes clean master
         source_video = str(result_path)
         print(f"[STYLE] Creating clean master from: {result_path}")
-        import shutil
-        shutil.copy2(source_video, clean_master_path)
+        # Reflink/hardlink instead of a byte copy: the result file is only ever
+        # replaced (os.replace below), so sharing its data is safe
+        method = await asyncio.to_thread(clone_file, source_video, clean_master_path)
+        print(f"[STYLE] Clean master created ({method})")
     
     # Temp output path
     temp_output = RESULTS_DIR / f"{Path(filename).stem}_styled_tmp.mp4"
-    if temp_output.exists():
-        temp_output.unlink()
+    temp_output.unlink(missing_ok=True)
     
     # Read existing metadata to keep AI-generated text content
     json_path = RESULTS_DIR / f"{Path(filename).stem}.json"
     blueprint_data = {}
-    if json_path.exists():
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                master_data = json.load(f)
-                blueprint_data = master_data.get("blueprint", {})
-        except Exception as e:
-            print(f"[STYLE] WARN: Could not read master JSON: {e}")
+    try:
+        master_data = await asyncio.to_thread(load_json, json_path)
+        blueprint_data = master_data.get("blueprint", {})
+    except FileNotFoundError:
+        pass # No master report for this result
+    except Exception as e:
+        print(f"[STYLE] WARN: Could not read master JSON: {e}")
 
     try:
-        # Apply visual styling
+        # Apply visual styling (FFmpeg render - on a worker thread so other requests keep flowing)
         print(f"[STYLE] Calling stylist...")
-        apply_visual_styling(
+        await asyncio.to_thread(
+            apply_visual_styling,
             input_video=source_video,
             output_video=str(temp_output),
             text_overlay=blueprint_data.get("text_overlay", ""),
@@ -1415,34 +2333,38 @@ async def apply_style(
             raise Exception("Styling failed - no output file created")
         
         # Replace original with restyled version
-        result_path.unlink()
-        temp_output.rename(result_path)
+        await asyncio.to_thread(os.replace, temp_output, result_path)
+        
+        # Dumped once by pydantic-core (JSON-ready types), reused for the report and the response
+        style_config_data = style_config.model_dump(mode="json")
         
         # Update master JSON report
-        if json_path.exists():
+        def update_master_json():
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    master_data = json.load(f)
+                master_data = load_json(json_path)
                 
                 # Persist style_config
-                master_data["style_config"] = style_config.model_dump()
+                master_data["style_config"] = style_config_data
                 
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(master_data, f, indent=2)
+                # orjson indent-2 via temp file + os.replace: readers never see a torn report
+                write_json_atomic(json_path, master_data, indent=True)
                 print(f"[STYLE] Updated master JSON with new StyleConfig")
+            except FileNotFoundError:
+                pass # No master report to update
             except Exception as json_error:
                 print(f"[STYLE] WARN: Failed updating result JSON: {json_error}")
+        
+        await asyncio.to_thread(update_master_json)
 
         return {
             "status": "success",
             "filename": filename,
-            "style_config": style_config
+            "style_config": style_config_data
         }
         
     except Exception as e:
         print(f"[STYLE] EXCEPTION: {e}")
-        if temp_output.exists():
-            temp_output.unlink()
+        temp_output.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"Styling failed: {str(e)}")
 
 
@@ -1450,8 +2372,57 @@ async def apply_style(
 # BACKGROUND REFRESH LOOP
 # ============================================================================
 
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Optional - without it the index is polled every INDEX_POLL_INTERVAL
+    Observer = None
+    FileSystemEventHandler = object
+
+INDEX_POLL_INTERVAL = 60.0 # Polling fallback when watchdog isn't installed
+INDEX_SAFETY_INTERVAL = 600.0 # Rescan even without events (missed/overflowed notifications)
+INDEX_SETTLE_DELAY = 2.0 # Let a burst of writes (render, cache dumps) land before rescanning
+_index_observer = None
+
+class _IndexChangeHandler(FileSystemEventHandler):
+    """Wakes refresh_index_loop from watchdog's thread on any library change."""
+    def __init__(self, loop: asyncio.AbstractEventLoop, wakeup: asyncio.Event):
+        self._loop = loop
+        self._wakeup = wakeup
+
+    def on_any_event(self, event):
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+def start_index_watcher(loop: asyncio.AbstractEventLoop, wakeup: asyncio.Event) -> bool:
+    """Watch the directories the index is built from. False if watchdog is unavailable."""
+    global _index_observer
+    if Observer is None:
+        return False
+    handler = _IndexChangeHandler(loop, wakeup)
+    observer = Observer()
+    for directory in (CLIPS_DIR, RESULTS_DIR, REFERENCES_DIR, CLIP_CACHE_DIR, REF_CACHE_DIR):
+        if directory.exists():
+            observer.schedule(handler, str(directory), recursive=False)
+    observer.daemon = True
+    observer.start()
+    _index_observer = observer
+    return True
+
 async def refresh_index_loop():
-    """Background task to keep the LibraryIndex fresh."""
+    """
+    Background task to keep the LibraryIndex fresh. With watchdog it sleeps until
+    a library directory changes (plus a slow safety rescan); without it, polls.
+    """
+    wakeup = asyncio.Event()
+    try:
+        watching = start_index_watcher(asyncio.get_running_loop(), wakeup)
+    except Exception as e:
+        print(f"[BACK] File watcher unavailable, polling instead: {e}")
+        watching = False
+    interval = INDEX_SAFETY_INTERVAL if watching else INDEX_POLL_INTERVAL
+    if watching:
+        # Change events keep the index current, so readers needn't force refreshes
+        LibraryIndex._refresh_interval = INDEX_SAFETY_INTERVAL
     while True:
         try:
             # We use the internal _refresh to avoid the interval check 
@@ -1459,7 +2430,12 @@ async def refresh_index_loop():
             await LibraryIndex._refresh()
         except Exception as e:
             print(f"[BACK] Refresh loop error: {e}")
-        await asyncio.sleep(60) # Refresh every minute
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=interval)
+            await asyncio.sleep(INDEX_SETTLE_DELAY)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
 
 @app.on_event("startup")
 async def startup_event():
@@ -1467,6 +2443,21 @@ async def startup_event():
     asyncio.create_task(LibraryIndex._refresh())
     # Start periodic refresh loop
     asyncio.create_task(refresh_index_loop())
+    # Start debounced state persistence
+    asyncio.create_task(persistence_flush_loop())
+    # Fold the append-only session log into the snapshot periodically
+    asyncio.create_task(session_compaction_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Don't lose coalesced writes that haven't been flushed yet
+    flush_pending_saves()
+    compact_sessions()
+    if _index_observer is not None:
+        _index_observer.stop()
+    # Drop queued background thumbnails; let running ffmpeg/index work finish
+    THUMB_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+    INDEX_EXECUTOR.shutdown(wait=True)
 
 if __name__ == "__main__":
     import uvicorn
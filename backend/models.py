@@ -4,9 +4,57 @@ These are the ONLY valid data structures. Do not create ad-hoc dictionaries.
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from operator import attrgetter
+from pydantic import BaseModel, Field, model_validator, ConfigDict, TypeAdapter
 from enum import Enum
 
+
+# ============================================================================
+# TIMELINE CHECKS (shared by StyleBlueprint / EDL validators)
+# ============================================================================
+
+# Below this many items the short-circuiting loop beats building NumPy arrays
+# (measured crossover is ~128-256 segments; typical blueprints have far fewer)
+_VECTORIZE_MIN_ITEMS = 256
+
+
+def _first_gap(items: list, end_attr: str, start_attr: str, tolerance: float = 0.01) -> int:
+    """
+    Index i of the first neighbour pair whose items[i].<end_attr> and
+    items[i+1].<start_attr> differ by more than tolerance, or -1 if continuous.
+    """
+    n = len(items)
+    if n < 2:
+        return -1
+    get_end, get_start = attrgetter(end_attr), attrgetter(start_attr)
+    if n < _VECTORIZE_MIN_ITEMS:
+        # Stops at the first bad pair; carries the previous end forward so each
+        # item is visited once, and compares both signs instead of calling abs()
+        it = iter(items)
+        prev_end = get_end(next(it))
+        for i, cur in enumerate(it):
+            d = prev_end - get_start(cur)
+            if d > tolerance or -d > tolerance:
+                return i
+            prev_end = get_end(cur)
+        return -1
+    import numpy as np  # Only long timelines get here; keeps numpy off the model import path
+    ends = np.fromiter(map(get_end, items), dtype=np.float64, count=n)
+    starts = np.fromiter(map(get_start, items), dtype=np.float64, count=n)
+    bad = np.flatnonzero(np.abs(ends[:-1] - starts[1:]) > tolerance)
+    return int(bad[0]) if bad.size else -1
+
+
+def _check_interval(start: float, end: float) -> None:
+    """Shared start/end bounds check: end must be strictly after start."""
+    if end <= start:
+        raise ValueError('end must be greater than start')
+
+
+def _ids_sequential(items: list) -> bool:
+    """True if items[i].id == i + 1 for every item. Stops at the first mismatch."""
+    return next((i for i, item in enumerate(items, start=1) if item.id != i), None) is None
+
 # ============================================================================
 # ENUMS (Controlled Vocabularies)
 # ============================================================================
@@ -126,36 +174,22 @@ class Segment(BaseModel):
     # v14.7 Prompt Mode: Cut Density Expectation
     cde: str = Field("Moderate", description="Cut Density Expectation: Sparse | Moderate | Dense")
     
-    @field_validator('shot_scale_role', 'temporal_weight', 'cut_motivation')
-    @classmethod
-    def validate_director_soul(cls, v, info):
-        """
-        v12.1 Assertion: Ensure semantic depth is present.
-        
-        v14.7 UPDATE: These fields are optional for Prompt Mode generated blueprints.
-        The validator now allows empty values, with defaults applied in Editor if needed.
-        This enables Prompt Mode to generate minimal blueprints while REFERENCE Mode
-        blueprints (from brain.py analysis) continue to enforce these fields.
-        """
-        # Allow empty values for Prompt Mode compatibility
-        # The Editor will use sensible defaults if these are empty
-        return v if v else ""
-    
-    @field_validator('end')
-    @classmethod
-    def end_after_start(cls, v, info):
-        if 'start' in info.data and v <= info.data['start']:
-            raise ValueError('end must be greater than start')
-        return v
-    
-    @field_validator('duration')
-    @classmethod
-    def duration_matches(cls, v, info):
-        if 'start' in info.data and 'end' in info.data:
-            expected = info.data['end'] - info.data['start']
-            if abs(v - expected) > 0.01:  # Allow 10ms float precision
-                raise ValueError(f'duration must equal end - start')
-        return v
+    # v14.7: shot_scale_role / temporal_weight / cut_motivation may be empty for
+    # Prompt Mode blueprints; the Editor applies sensible defaults if so.
+    
+    # Cross-field checks run once on the built model (plain attribute reads)
+    # instead of as per-field validators that each materialize info.data
+    @model_validator(mode='after')
+    def check_timing(self) -> 'Segment':
+        _check_interval(self.start, self.end)
+        if abs(self.duration - (self.end - self.start)) > 0.01:  # Allow 10ms float precision
+            raise ValueError('duration must equal end - start')
+        return self
+
+
+# Validates a whole list of raw segment dicts in one pydantic-core call instead of
+# one Segment(**kwargs) construction per item (generated/fallback blueprints)
+SEGMENTS_ADAPTER = TypeAdapter(List[Segment])
 
 
 class TextEvent(BaseModel):
@@ -246,42 +280,41 @@ class StyleBlueprint(BaseModel):
     # Identity Passport (v12.1)
     contract: dict = Field(default_factory=dict, alias="_contract", serialization_alias="_contract", validation_alias="_contract", description="Self-describing identity: version, type, source_hash")
     
-    @field_validator('segments')
-    @classmethod
-    def validate_segments(cls, v, info):
+    @model_validator(mode='after')
+    def validate_segments(self) -> 'StyleBlueprint':
+        # One pass over the built model: total_duration and segments are plain attributes
+        v = self.segments
         if not v:
             raise ValueError('Must have at least one segment')
         
         # Check sequential IDs
-        for i, seg in enumerate(v, start=1):
-            if seg.id != i:
-                raise ValueError(f'Segment IDs must be sequential starting from 1')
+        if not _ids_sequential(v):
+            raise ValueError(f'Segment IDs must be sequential starting from 1')
         
         # Check continuity (no gaps/overlaps)
-        for i in range(len(v) - 1):
-            if abs(v[i].end - v[i+1].start) > 0.01:
-                raise ValueError(f'Gap/overlap between segments {i+1} and {i+2}')
+        i = _first_gap(v, "end", "start")
+        if i >= 0:
+            raise ValueError(f'Gap/overlap between segments {i+1} and {i+2}')
         
         # Check total duration matches last segment end
-        if 'total_duration' in info.data:
-            expected_duration = info.data['total_duration']
-            last_segment_end = v[-1].end
-            gap = expected_duration - last_segment_end
+        expected_duration = self.total_duration
+        last_segment_end = v[-1].end
+        gap = expected_duration - last_segment_end
+        
+        # If Gemini truncated the video (common bug), auto-extend the last segment
+        if gap > 0.1:  # More than 100ms gap
+            print(f"[VALIDATION] Gemini truncated analysis: video is {expected_duration:.2f}s but segments end at {last_segment_end:.2f}s")
+            print(f"[VALIDATION] Auto-extending last segment by {gap:.2f}s to match video duration")
+            
+            # Extend the last segment to match video duration
+            v[-1].end = expected_duration
+            v[-1].duration = v[-1].end - v[-1].start
             
-            # If Gemini truncated the video (common bug), auto-extend the last segment
-            if gap > 0.1:  # More than 100ms gap
-                print(f"[VALIDATION] Gemini truncated analysis: video is {expected_duration:.2f}s but segments end at {last_segment_end:.2f}s")
-                print(f"[VALIDATION] Auto-extending last segment by {gap:.2f}s to match video duration")
-                
-                # Extend the last segment to match video duration
-                v[-1].end = expected_duration
-                v[-1].duration = v[-1].end - v[-1].start
-                
-            # If segments extend beyond video (shouldn't happen, but check)
-            elif gap < -0.1:  # Segments go 100ms+ past video end
-                raise ValueError(f'Segments extend beyond video duration (video: {expected_duration:.2f}s, segments end: {last_segment_end:.2f}s)')
+        # If segments extend beyond video (shouldn't happen, but check)
+        elif gap < -0.1:  # Segments go 100ms+ past video end
+            raise ValueError(f'Segments extend beyond video duration (video: {expected_duration:.2f}s, segments end: {last_segment_end:.2f}s)')
         
-        return v
+        return self
 
 
 # ============================================================================
@@ -303,24 +336,6 @@ class ArcStageGuidance(BaseModel):
     required_energy: str = Field("", description="OVERRIDE: Required energy level for this arc stage (Low/Medium/High) - overrides reference's mechanical labels when text overlay demands it")
 
 
-class LibraryAssessment(BaseModel):
-    """
-    Gemini's overall assessment of the user's clip library.
-    """
-    strengths: List[str] = Field(default_factory=list, description="What types of content are well-represented")
-    gaps: List[str] = Field(default_factory=list, description="What types of content are missing or weak")
-    confidence: str = Field("Medium", description="High, Medium, or Low confidence in library coverage")
-
-
-class CreativeAudit(BaseModel):
-    """
-    Deeper analysis of the synergy between Reference Theme and User Library.
-    """
-    reference_theme: str = Field("", description="The primary visual/emotional theme of the reference (e.g. 'Mountains / Nature')")
-    library_theme: str = Field("", description="The dominant theme detected in user clips (e.g. 'City / Urban')")
-    thematic_dissonance: str = Field("", description="Description of mismatch between reference and library themes")
-    critical_nuance: str = Field("", description="Subtle mismatch (e.g. 'Reference is 4:3 filmic, Library is 9:16 digital')")
-
 class LibraryAlignment(BaseModel):
     """
     Structured assessment of how well the library matches the reference style.
@@ -475,12 +490,6 @@ class AdvisorHints(BaseModel):
         description="Per-segment moment plans from Advisor (v14.0 contextual selection)"
     )
     
-    # Legacy fields (for backward compatibility with v2.0 cache)
-    library_assessment: LibraryAssessment | None = Field(None, description="DEPRECATED: Use library_alignment")
-    creative_audit: CreativeAudit | None = Field(None, description="DEPRECATED: Merged into library_alignment")
-    overall_strategy: str = Field("", description="DEPRECATED: Use editorial_strategy")
-    required_improvements: List[str] = Field(default_factory=list, description="DEPRECATED: No longer used")
-    
     cache_version: str = Field("4.1", description="Advisor cache version (4.1 = v14.0 contextual moment support)")
     cached_at: str = Field("", description="ISO timestamp when cached")
 
@@ -502,18 +511,19 @@ class BestMoment(BaseModel):
         "reason": "Peak action moment with fast motion"
     }
     """
+    # Immutable value object: never edited after analysis, hashable for dedup
+    model_config = ConfigDict(frozen=True)
+    
     start: float = Field(..., ge=0, description="Start time in seconds")
     end: float = Field(..., gt=0, description="End time in seconds")
     moment_role: str = Field("", description="Establishing, Build, Climax, Transition, or Reflection")
     stable_moment: bool = Field(True, description="Whether moment is visually stable for full duration")
     reason: str | None = Field(None, description="Why this moment was selected")
     
-    @field_validator('end')
-    @classmethod
-    def end_after_start(cls, v, info):
-        if 'start' in info.data and v <= info.data['start']:
-            raise ValueError('end must be greater than start')
-        return v
+    @model_validator(mode='after')
+    def check_timing(self) -> 'BestMoment':
+        _check_interval(self.start, self.end)
+        return self
 
 
 class ClipMetadata(BaseModel):
@@ -555,10 +565,6 @@ class ClipMetadata(BaseModel):
     # Identity Passport (v12.1)
     contract: dict = Field(default_factory=dict, alias="_contract", serialization_alias="_contract", validation_alias="_contract", description="Self-describing identity: version, type, source_hash")
     
-    # Legacy fields for backward compatibility (deprecated - use best_moments instead)
-    best_moment_start: float | None = Field(None, ge=0, description="DEPRECATED: Use best_moments instead")
-    best_moment_end: float | None = Field(None, gt=0, description="DEPRECATED: Use best_moments instead")
-    
     def get_best_moment_for_energy(self, energy: EnergyLevel) -> tuple[float, float] | None:
         """
         Get the best moment timestamps for a specific energy level.
@@ -566,26 +572,19 @@ class ClipMetadata(BaseModel):
         Returns:
             Tuple of (start, end) or None if not available
         """
-        if self.best_moments and energy.value in self.best_moments:
-            moment = self.best_moments[energy.value]
-            return (moment.start, moment.end)
-        
-        # Fallback to legacy fields
-        if self.best_moment_start is not None and self.best_moment_end is not None:
-            return (self.best_moment_start, self.best_moment_end)
-        
-        return None
-    
-    @field_validator('best_moment_end')
-    @classmethod
-    def validate_best_moment(cls, v, info):
-        if v is not None and 'best_moment_start' in info.data:
-            start = info.data.get('best_moment_start')
-            if start is not None and v <= start:
-                raise ValueError('best_moment_end must be greater than best_moment_start')
-            if 'duration' in info.data and v > info.data['duration']:
-                raise ValueError('best_moment_end cannot exceed clip duration')
-        return v
+        # The matcher asks for these per (clip x segment) pair, so the
+        # (start, end) spans are derived once and cached in __dict__ (not
+        # PrivateAttr, whose reads go through BaseModel.__getattr__; the
+        # serializer only emits declared fields). The cache is tied to the
+        # best_moments object it was built from, so reassignment,
+        # model_copy(update=...) and model_construct() rebuild it; in-place
+        # edits of the dict are not tracked.
+        moments = self.best_moments
+        cached = self.__dict__.get('_moment_spans')
+        if cached is None or cached[0] is not moments:
+            spans = {level: (m.start, m.end) for level, m in moments.items()} if moments else {}
+            cached = self.__dict__['_moment_spans'] = (moments, spans)
+        return cached[1].get(energy.value)
 
 
 class ClipIndex(BaseModel):
@@ -593,6 +592,10 @@ class ClipIndex(BaseModel):
     clips: List[ClipMetadata] = Field(..., min_length=1)
 
 
+# Bulk counterpart of SEGMENTS_ADAPTER for raw clip dicts (mock/fallback indexes)
+CLIPS_ADAPTER = TypeAdapter(List[ClipMetadata])
+
+
 # ============================================================================
 # EDIT DECISION LIST (EDL)
 # ============================================================================
@@ -630,18 +633,18 @@ class EDL(BaseModel):
     """
     decisions: List[EditDecision]
     
-    @field_validator('decisions')
-    @classmethod
-    def validate_timeline(cls, v):
+    @model_validator(mode='after')
+    def validate_timeline(self) -> 'EDL':
+        v = self.decisions
         if not v:
             raise ValueError('EDL cannot be empty')
         
         # Check timeline continuity
-        for i in range(len(v) - 1):
-            if abs(v[i].timeline_end - v[i+1].timeline_start) > 0.01:
-                raise ValueError(f'Timeline gap/overlap between decisions {i} and {i+1}')
+        i = _first_gap(v, "timeline_end", "timeline_start")
+        if i >= 0:
+            raise ValueError(f'Timeline gap/overlap between decisions {i} and {i+1}')
         
-        return v
+        return self
 
 
 # ============================================================================
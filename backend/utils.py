@@ -103,9 +103,12 @@ def get_fast_hash(path: str | Path) -> str:
 
 import json
 import hashlib
+import os
+import tempfile
 import time
 
 import threading
+from collections import OrderedDict
 
 _ROOT_DIR = Path(__file__).resolve().parent.parent
 _HASH_REGISTRY_PATH = _ROOT_DIR / "data" / "cache" / "hash_registry.json"
@@ -137,31 +140,66 @@ def save_hash_registry():
                 json.dump(_hash_cache, f)
         except: pass
 
-def get_file_hash(path: str | Path) -> str:
+# In-process LRU in front of the registry, keyed by (path, mtime_ns, size) so
+# any rewrite of a file changes its key and stale hashes are never returned.
+_HASH_LRU_SIZE = 4096
+_hash_lru: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _registry_key(p: Path, stat: os.stat_result) -> str:
+    # Name is part of the key: (mtime, size) alone collides for same-size
+    # files written within the same second
+    return f"{p.name}_{int(stat.st_mtime)}_{stat.st_size}"
+
+
+def _lru_key(p: Path, stat: os.stat_result) -> tuple:
+    return (str(p), stat.st_mtime_ns, stat.st_size)
+
+
+def _remember_hash(lru_key: tuple, value: str) -> None:
+    # Caller holds _registry_lock
+    _hash_lru[lru_key] = value
+    _hash_lru.move_to_end(lru_key)
+    if len(_hash_lru) > _HASH_LRU_SIZE:
+        _hash_lru.popitem(last=False)
+
+
+def get_file_hash(path: str | Path, stat: os.stat_result | None = None) -> str:
     """
     Get a hash of a file with persistent caching.
     Uses (name, size, mtime) as a fingerprint to avoid re-reading the file.
+    Callers that already stat'ed the file can pass the result to skip another stat.
     """
-    _ensure_registry_loaded()
     p = Path(path)
-    if not p.exists(): return ""
-    
+    if stat is None:
+        try:
+            stat = p.stat()
+        except OSError:
+            return ""
+
+    lru_key = _lru_key(p, stat)
+    with _registry_lock:
+        h = _hash_lru.get(lru_key)
+        if h is not None:
+            _hash_lru.move_to_end(lru_key)
+            return h
+
+    _ensure_registry_loaded()
     try:
-        stat = p.stat()
-        mtime = stat.st_mtime
-        size = stat.st_size
-        
-        key_int = f"{int(mtime)}_{size}"
+        key_int = _registry_key(p, stat)
         
         with _registry_lock:
             if key_int in _hash_cache:
-                return _hash_cache[key_int]
+                h = _hash_cache[key_int]
+                _remember_hash(lru_key, h)
+                return h
         
         # Cache miss: do the work (outside lock to avoid blocking other lookups)
         h = get_fast_hash(p)
         if h:
             with _registry_lock:
                 _hash_cache[key_int] = h
+                _remember_hash(lru_key, h)
             # Save immediately to ensure persistence if called outside refresh loop
             save_hash_registry()
         return h
@@ -183,20 +221,241 @@ def get_bytes_hash(content: bytes) -> str:
     return hasher.hexdigest()
 
 
+# Full-content identity (session ids, reference dedup) is always SHA-256 (SHA-NI
+# accelerated on modern OpenSSL builds). These digests are persisted, so the
+# algorithm must not depend on which optional packages are installed. Digests
+# are cut to 32 hex chars so ids keep their existing length.
+CONTENT_HASH_NAME = "sha256"
+CONTENT_HASH_HEX_LEN = 32
+
+
+def new_content_hasher():
+    """Return a fresh streaming hasher for full-content identity."""
+    return hashlib.sha256()
+
+
+def content_hexdigest(hasher) -> str:
+    return hasher.hexdigest()[:CONTENT_HASH_HEX_LEN]
+
+
+def get_content_identity(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """Full-content identity hash of a file, streamed in fixed-size chunks."""
+    hasher = new_content_hasher()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return content_hexdigest(hasher)
+
+
+def new_session_hasher():
+    """
+    Return a fresh streaming hasher for session ids (sess_*, text_music_*).
+    Ids are persisted, so this is always the fixed content hasher - never an
+    optional accelerator whose presence would change them per install.
+    """
+    return new_content_hasher()
+
+
+class SampledHasher:
+    """
+    Incremental form of get_bytes_hash() for streamed content.
+    Keeps at most the first 128KB and a rolling last-64KB window, so memory
+    stays bounded however large the stream is.
+    """
+
+    _SAMPLE = 64 * 1024
+
+    def __init__(self):
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.size = 0
+
+    def update(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        room = 2 * self._SAMPLE - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+        self._tail += chunk[-self._SAMPLE:]
+        if len(self._tail) > self._SAMPLE:
+            del self._tail[:-self._SAMPLE]
+
+    def hexdigest(self) -> str:
+        hasher = hashlib.md5()
+        if self.size < 2 * self._SAMPLE:
+            hasher.update(self._head)
+        else:
+            hasher.update(self._head[:self._SAMPLE])
+            hasher.update(self._tail)
+        hasher.update(str(self.size).encode())
+        return hasher.hexdigest()
+
+
+def copy_and_hash(src, dest: str | Path | None, *hashers, chunk_size: int = 1 << 20, size_hint: int | None = None) -> int:
+    """
+    Stream a binary file object through hashers in fixed-size chunks,
+    optionally writing it to dest in the same pass. Returns the byte count.
+    With size_hint, dest's extent is reserved up front (posix_fallocate) so the
+    filesystem allocates it in one go instead of growing it chunk by chunk.
+    """
+    size = 0
+    out = open(dest, "wb") if dest is not None else None
+    preallocated = False
+    try:
+        if out is not None and size_hint and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(out.fileno(), 0, size_hint)
+                preallocated = True
+            except OSError:
+                pass  # Filesystem without fallocate support - plain growth still works
+        while chunk := src.read(chunk_size):
+            for hasher in hashers:
+                hasher.update(chunk)
+            if out is not None:
+                out.write(chunk)
+            size += len(chunk)
+        if preallocated and size != size_hint:
+            out.truncate(size)
+    finally:
+        if out is not None:
+            out.close()
+    return size
+
+
+try:
+    import fcntl
+except ImportError:  # Windows - clone_file() goes straight to hardlink/copy
+    fcntl = None
+
+_FICLONE = 0x40049409  # linux/fs.h: share src's extents with dst (btrfs/xfs/bcachefs)
+
+
+def clone_file(src: str | Path, dst: str | Path) -> str:
+    """
+    Duplicate src at dst as cheaply as the filesystem allows: a copy-on-write
+    reflink, else a hardlink, else a full copy2(). Returns the method used.
+    A hardlink shares the inode, so only use this for files that are replaced
+    (unlink + rename), never rewritten in place.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return "reflink"
+        except OSError:
+            try:
+                os.unlink(dst)
+            except OSError:
+                pass
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
 def register_file_hash(path: str | Path, value: str) -> None:
     _ensure_registry_loaded()
     p = Path(path)
-    if not p.exists():
-        return
     try:
         stat = p.stat()
-        key_int = f"{int(stat.st_mtime)}_{stat.st_size}"
-        _hash_cache[key_int] = value
-    except:
+    except OSError:
         return
+    with _registry_lock:
+        _hash_cache[_registry_key(p, stat)] = value
+        _remember_hash(_lru_key(p, stat), value)
 
 
 def get_content_hash(content: bytes) -> str:
     return get_bytes_hash(content)
 
 
+# ============================================================================
+# JSON PERSISTENCE
+# ============================================================================
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator - stdlib json is the fallback
+    orjson = None
+
+
+# Per-thread reusable read buffer: index refreshes parse thousands of small
+# intel files from worker threads, so reuse one allocation per thread.
+_READ_BUFFER_SIZE = 64 * 1024
+_read_buffers = threading.local()
+
+
+def _read_into_buffer(f):
+    """Read an open binary file into this thread's reusable buffer."""
+    size = os.fstat(f.fileno()).st_size + 1  # +1 byte detects growth since fstat
+    buf = getattr(_read_buffers, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = bytearray(max(size, _READ_BUFFER_SIZE))
+        _read_buffers.buf = buf
+    view = memoryview(buf)[:size]
+    n = f.readinto(view)
+    if n == size:
+        # File grew while reading - append the remainder
+        return bytes(view) + f.read()
+    return view[:n]
+
+
+def load_json(path: str | Path):
+    """Parse a JSON file, using orjson when available."""
+    with open(path, "rb") as f:
+        if orjson is not None:
+            # orjson parses straight out of the shared buffer, no bytes copy
+            return orjson.loads(_read_into_buffer(f))
+        raw = f.read()
+    return json.loads(raw)
+
+
+def loads_json(data: bytes | str):
+    """Parse JSON from bytes/str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json_bytes(data, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+# Process umask, read once (os.umask can only be queried by setting it).
+# mkstemp creates files 0600; atomic writes restore the usual open() mode.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+def write_json_atomic(path: str | Path, data, indent: bool = False) -> None:
+    """
+    Write JSON to path via a sibling temp file and os.replace().
+    Readers see either the old file or the new one, never a torn write.
+    """
+    p = Path(path)
+    # Unique temp name: concurrent writers to the same path must not share it
+    fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=p.name + ".", suffix=".tmp")
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _NEW_FILE_MODE)
+        with os.fdopen(fd, "wb") as f:
+            f.write(dump_json_bytes(data, indent=indent))
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
@@ -26,8 +26,19 @@ if _parent_utils.exists():
     get_file_hash = utils_module.get_file_hash
     get_content_hash = utils_module.get_content_hash
     get_bytes_hash = utils_module.get_bytes_hash
+    SampledHasher = utils_module.SampledHasher
+    new_content_hasher = utils_module.new_content_hasher
+    new_session_hasher = utils_module.new_session_hasher
+    content_hexdigest = utils_module.content_hexdigest
+    get_content_identity = utils_module.get_content_identity
+    copy_and_hash = utils_module.copy_and_hash
+    clone_file = utils_module.clone_file
     register_file_hash = utils_module.register_file_hash
     save_hash_registry = utils_module.save_hash_registry
+    load_json = utils_module.load_json
+    loads_json = utils_module.loads_json
+    dump_json_bytes = utils_module.dump_json_bytes
+    write_json_atomic = utils_module.write_json_atomic
 else:
     # Fallback if utils.py doesn't exist
     def ensure_directory(path):
@@ -40,7 +51,7 @@ else:
     def get_fast_hash(path):
         return ""
         
-    def get_file_hash(path):
+    def get_file_hash(path, stat=None):
         return ""
         
     def get_content_hash(content):
@@ -49,16 +60,92 @@ else:
     def get_bytes_hash(content):
         return ""
 
+    class SampledHasher:
+        def __init__(self):
+            self.size = 0
+
+        def update(self, chunk):
+            self.size += len(chunk)
+
+        def hexdigest(self):
+            return ""
+
+    def new_content_hasher():
+        import hashlib
+        return hashlib.sha256()
+
+    def new_session_hasher():
+        return new_content_hasher()
+
+    def content_hexdigest(hasher):
+        return hasher.hexdigest()[:32]
+
+    def get_content_identity(path, chunk_size=1 << 20):
+        hasher = new_content_hasher()
+        with open(path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                hasher.update(chunk)
+        return content_hexdigest(hasher)
+
+    def copy_and_hash(src, dest, *hashers, chunk_size=1 << 20, size_hint=None):
+        data = src.read()
+        for hasher in hashers:
+            hasher.update(data)
+        if dest is not None:
+            Path(dest).write_bytes(data)
+        return len(data)
+
+    def clone_file(src, dst):
+        import shutil
+        shutil.copy2(src, dst)
+        return "copy"
+
     def register_file_hash(path, value):
         return None
         
     def save_hash_registry():
         pass
 
+    def load_json(path):
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def loads_json(data):
+        import json
+        return json.loads(data)
+
+    def dump_json_bytes(data, indent=False):
+        import json
+        return json.dumps(data, indent=2 if indent else None).encode("utf-8")
+
+    def write_json_atomic(path, data, indent=False):
+        import os
+        import tempfile
+        p = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=p.name + ".", suffix=".tmp")
+        try:
+            if hasattr(os, "fchmod"):
+                umask = os.umask(0)
+                os.umask(umask)
+                os.fchmod(fd, 0o666 & ~umask)
+            with os.fdopen(fd, "wb") as f:
+                f.write(dump_json_bytes(data, indent=indent))
+            os.replace(tmp, p)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
 __all__ = [
     'get_key_manager', 'get_api_key', 'rotate_api_key',
     'ensure_directory', 'cleanup_session', 'cleanup_all_temp',
     'get_file_size_mb', 'format_duration', 'get_fast_hash',
     'get_file_hash', 'get_content_hash', 'get_bytes_hash',
-    'register_file_hash', 'save_hash_registry'
+    'SampledHasher', 'copy_and_hash', 'clone_file',
+    'new_content_hasher', 'new_session_hasher', 'content_hexdigest', 'get_content_identity',
+    'register_file_hash', 'save_hash_registry',
+    'load_json', 'loads_json', 'dump_json_bytes', 'write_json_atomic'
 ]
@@ -5,8 +5,10 @@ from pathlib import Path
 # Add the backend directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "backend")))
 
-from backend.engine.orchestrator import run_mimic_pipeline
-from backend.models import PipelineResult
+# Import through the backend path like the engine does, so models.py loads once
+# (a "backend.models" import would be a second copy with distinct classes)
+from engine.orchestrator import run_mimic_pipeline
+from models import PipelineResult
 
 def run_test(ref_name: str, session_suffix: str = "master"):
     # 1. Setup paths